@@ -0,0 +1,93 @@
+from bisect import bisect_left
+
+# Offline replay of AggregatorOracle.getETHPx over historical source prices. Series are aligned per
+# block: series[token] is a list of sources, each a list with one price per block (None where the
+# source call reverted). Each block reproduces the contract: valid sources only, sorted, then the
+# single price, the pair average or the median / in-range pair average, with the same
+# 'too much deviation' reverts. The deviation ratios are kept per block so maxPriceDeviation can be
+# swept without replaying the prices again. A zero price makes the contract divide by zero; that block
+# reverts on its own instead of aborting the replay.
+
+MIN_PRICE_DEVIATION = 10**18
+MAX_PRICE_DEVIATION = 15 * 10**17
+
+
+def check_sources(sources, max_deviation):
+    '''Reproduce the checks of AggregatorOracle.setPrimarySources.'''
+    if not MIN_PRICE_DEVIATION <= max_deviation <= MAX_PRICE_DEVIATION:
+        raise Exception('bad max deviation value')
+    if len(sources) > 3:
+        raise Exception('sources length exceed 3')
+
+
+def ratios(prices):
+    '''Sorted valid prices of one block and the deviation of each adjacent pair, as the contract
+    computes it (higher * 1e18 / lower), None where the lower price is 0.'''
+    prices = sorted(px for px in prices if px is not None)
+    return prices, [hi * 10**18 // lo if lo else None for lo, hi in zip(prices, prices[1:])]
+
+
+def aggregate(prices, deviations, max_deviation):
+    '''Return (price, revert message) for the sorted prices and deviations of one block.'''
+    if not prices:
+        return None, 'no valid source'
+    if len(prices) == 1:
+        return prices[0], None
+    if len(prices) <= 3 and deviations[0] is None:
+        return None, 'division by zero'
+    if len(prices) == 2:
+        if deviations[0] > max_deviation:
+            return None, 'too much deviation (2 valid sources)'
+        return (prices[0] + prices[1]) // 2, None
+    if len(prices) == 3:
+        mid_min_ok = deviations[0] <= max_deviation
+        max_mid_ok = deviations[1] <= max_deviation
+        if mid_min_ok and max_mid_ok:
+            return prices[1], None
+        if mid_min_ok:
+            return (prices[0] + prices[1]) // 2, None
+        if max_mid_ok:
+            return (prices[1] + prices[2]) // 2, None
+        return None, 'too much deviation (3 valid sources)'
+    return None, 'more than 3 valid sources not supported'
+
+
+class Replay:
+    '''Per-block sorted prices and deviations of one token.'''
+
+    def __init__(self, blocks, sources):
+        if not sources:
+            raise Exception('no primary source')
+        self.blocks = blocks
+        self.rows = [ratios(prices) for prices in zip(*sources)]
+
+    def prices(self, max_deviation):
+        '''Return (prices, reverts): the price the bank sees per block (None when getETHPx reverts),
+        and (block, message) of each revert.'''
+        prices = []
+        reverts = []
+        for block, (sorted_prices, deviations) in zip(self.blocks, self.rows):
+            px, error = aggregate(sorted_prices, deviations, max_deviation)
+            prices.append(px)
+            if error is not None:
+                reverts.append((block, error))
+        return prices, reverts
+
+    def sweep(self, max_deviations):
+        '''Number of 'too much deviation' reverts for each candidate maxPriceDeviation.
+        A block reverts below the smallest deviation among its adjacent pairs (3 sources) or the
+        only one (2 sources), so it is a count over sorted thresholds.'''
+        thresholds = sorted(
+            min(deviations) for prices, deviations in self.rows
+            if 2 <= len(prices) <= 3 and deviations[0] is not None
+        )
+        return {dev: len(thresholds) - bisect_left(thresholds, dev + 1) for dev in max_deviations}
+
+
+def replay(blocks, series, max_deviations):
+    '''Replay every token, return token -> (prices, reverts).'''
+    results = {}
+    for token, sources in series.items():
+        check_sources(sources, max_deviations[token])
+        results[token] = Replay(blocks, sources).prices(max_deviations[token])
+    return results
@@ -0,0 +1,132 @@
+# BalancerPairOracle off-chain. computeFairReserves and getETHPx are reproduced bit for bit on Python
+# ints, including the BNum rounding (bmul/bdiv round half up) and the bpowApprox series that stops
+# once a term drops below BPOW_PRECISION; nothing goes through floating point. The *_many functions
+# take parallel lists of pools or price points, for bulk analytics without a call to the oracle.
+
+BONE = 10**18
+MIN_BPOW_BASE = 1
+MAX_BPOW_BASE = 2 * BONE - 1
+BPOW_PRECISION = BONE // 10**10
+UINT_MAX = 2**256 - 1
+
+
+def btoi(a):
+    return a // BONE
+
+
+def bfloor(a):
+    return btoi(a) * BONE
+
+
+def badd(a, b):
+    c = a + b
+    if c > UINT_MAX:
+        raise Exception('ERR_ADD_OVERFLOW')
+    return c
+
+
+def bsub(a, b):
+    if a < b:
+        raise Exception('ERR_SUB_UNDERFLOW')
+    return a - b
+
+
+def bsub_sign(a, b):
+    return (a - b, False) if a >= b else (b - a, True)
+
+
+def bmul(a, b):
+    c0 = a * b
+    if c0 + BONE // 2 > UINT_MAX:
+        raise Exception('ERR_MUL_OVERFLOW')
+    return (c0 + BONE // 2) // BONE
+
+
+def bdiv(a, b):
+    if b == 0:
+        raise Exception('ERR_DIV_ZERO')
+    c0 = a * BONE
+    if c0 + b // 2 > UINT_MAX:
+        raise Exception('ERR_DIV_INTERNAL')
+    return (c0 + b // 2) // b
+
+
+def bpowi(a, n):
+    z = a if n % 2 else BONE
+    n //= 2
+    while n:
+        a = bmul(a, a)
+        if n % 2:
+            z = bmul(z, a)
+        n //= 2
+    return z
+
+
+def bpow_approx(base, exp, precision):
+    x, xneg = bsub_sign(base, BONE)
+    term = BONE
+    total = term
+    negative = False
+    i = 1
+    while term >= precision:
+        big_k = i * BONE
+        c, cneg = bsub_sign(exp, bsub(big_k, BONE))
+        term = bdiv(bmul(term, bmul(c, x)), big_k)
+        if term == 0:
+            break
+        if xneg:
+            negative = not negative
+        if cneg:
+            negative = not negative
+        total = bsub(total, term) if negative else badd(total, term)
+        i += 1
+    return total
+
+
+def bpow(base, exp):
+    if base < MIN_BPOW_BASE:
+        raise Exception('ERR_BPOW_BASE_TOO_LOW')
+    if base > MAX_BPOW_BASE:
+        raise Exception('ERR_BPOW_BASE_TOO_HIGH')
+    whole = bfloor(exp)
+    remain = bsub(exp, whole)
+    whole_pow = bpowi(base, btoi(whole))
+    if remain == 0:
+        return whole_pow
+    return bmul(whole_pow, bpow_approx(base, remain, BPOW_PRECISION))
+
+
+def compute_fair_reserves(res_a, res_b, w_a, w_b, px_a, px_b):
+    '''Return (fairResA, fairResB) exactly as BalancerPairOracle.computeFairReserves.'''
+    r0 = bdiv(res_a, res_b)
+    r1 = bdiv(bmul(w_a, px_b), bmul(w_b, px_a))
+    if r0 > r1:
+        ratio = bdiv(r1, r0)
+        return bmul(res_a, bpow(ratio, w_b)), bdiv(res_b, bpow(ratio, w_a))
+    ratio = bdiv(r0, r1)
+    return bdiv(res_a, bpow(ratio, w_b)), bmul(res_b, bpow(ratio, w_a))
+
+
+def get_eth_px(res_a, res_b, w_a, w_b, px_a, px_b, total_supply):
+    '''BPT price in ETH times 2**112, as BalancerPairOracle.getETHPx for a 2-token pool.'''
+    fair_a, fair_b = compute_fair_reserves(res_a, res_b, w_a, w_b, px_a, px_b)
+    value = fair_a * px_a + fair_b * px_b
+    if fair_a * px_a > UINT_MAX or fair_b * px_b > UINT_MAX:
+        raise Exception('SafeMath: multiplication overflow')
+    if value > UINT_MAX:
+        raise Exception('SafeMath: addition overflow')
+    if total_supply == 0:
+        raise Exception('SafeMath: division by zero')
+    return value // total_supply
+
+
+def fair_reserves_many(res_a, res_b, w_a, w_b, px_a, px_b):
+    '''compute_fair_reserves over parallel lists of pools or price points. Return (fairResA, fairResB)
+    lists.'''
+    fair = [compute_fair_reserves(*pool) for pool in zip(res_a, res_b, w_a, w_b, px_a, px_b)]
+    return [fair_a for fair_a, _ in fair], [fair_b for _, fair_b in fair]
+
+
+def eth_px_many(res_a, res_b, w_a, w_b, px_a, px_b, total_supply):
+    '''get_eth_px over parallel lists of pools or price points.'''
+    return [get_eth_px(*pool) for pool in zip(res_a, res_b, w_a, w_b, px_a, px_b, total_supply)]
@@ -0,0 +1,216 @@
+import sys
+
+# Off-chain model of HomoraBank accounting: banks, positions, debt shares and their exact
+# integer math, for what-if analysis over the whole position book without eth_calls.
+# Amounts are Python ints and every division rounds the way the contract does.
+# cToken interactions are assumed exact: a borrow or repay of x moves the bank's cToken debt by x.
+
+MAX_UINT = 2**256 - 1
+ZERO_ADDRESS = '0x0000000000000000000000000000000000000000'
+
+
+def add(a, b):
+    '''SafeMath.add.'''
+    c = a + b
+    if c > MAX_UINT:
+        raise Exception('SafeMath: addition overflow')
+    return c
+
+
+def sub(a, b):
+    '''SafeMath.sub.'''
+    if b > a:
+        raise Exception('SafeMath: subtraction overflow')
+    return a - b
+
+
+def div(a, b):
+    '''SafeMath.div.'''
+    if b == 0:
+        raise Exception('SafeMath: division by zero')
+    return a // b
+
+
+def ceil_div(a, b):
+    '''HomoraSafeMath.ceilDiv: round-up division, a.add(b).sub(1).div(b).'''
+    return div(sub(add(a, b), 1), b)
+
+
+class Bank:
+    __slots__ = ('token', 'index', 'c_token', 'reserve', 'total_debt', 'total_share')
+
+    def __init__(self, token, index, c_token=None, reserve=0, total_debt=0, total_share=0):
+        self.token = token
+        self.index = index  # bit of this bank in Position.debt_map
+        self.c_token = c_token
+        self.reserve = reserve
+        self.total_debt = total_debt
+        self.total_share = total_share
+
+    def debt_of(self, share):
+        '''Debt of `share` debt shares, as in borrowBalanceStored.'''
+        if share == 0 or self.total_debt == 0:
+            return 0
+        return ceil_div(share * self.total_debt, self.total_share)
+
+
+class Position:
+    # Debt shares are keyed by bank index, and addresses are interned, so that a position costs
+    # a few hundred bytes and millions of them fit in memory.
+    __slots__ = ('owner', 'coll_token', 'coll_id', 'collateral_size', 'debt_map', 'debt_shares')
+
+    def __init__(self, owner, coll_token=ZERO_ADDRESS, coll_id=0, collateral_size=0, debt_map=0, debt_shares=None):
+        self.owner = sys.intern(owner)
+        self.coll_token = sys.intern(coll_token)
+        self.coll_id = coll_id
+        self.collateral_size = collateral_size
+        self.debt_map = debt_map  # i^th bit is set iff debt share of i^th bank is nonzero
+        self.debt_shares = debt_shares or {}  # bank index -> debt share
+
+    def debt_indexes(self):
+        '''Indexes of the banks this position owes, walking debt_map like the contract does.'''
+        bit_map = self.debt_map
+        idx = 0
+        while bit_map > 0:
+            if bit_map & 1:
+                yield idx
+            idx += 1
+            bit_map >>= 1
+
+
+class HomoraBankModel:
+    def __init__(self, fee_bps=0):
+        self.fee_bps = fee_bps
+        self.all_banks = []  # bank tokens, in index order
+        self.banks = {}  # token -> Bank
+        self.positions = {}  # position id -> Position
+        self.next_position_id = 1
+
+    def add_bank(self, token, c_token=None):
+        if token in self.banks:
+            raise Exception('bank already exists')
+        if len(self.all_banks) >= 256:
+            raise Exception('reach bank limit')
+        bank = Bank(sys.intern(token), len(self.all_banks), c_token)
+        self.banks[token] = bank
+        self.all_banks.append(bank.token)
+        return bank
+
+    def bank(self, token):
+        bank = self.banks.get(token)
+        if bank is None:
+            raise Exception('bank not exist')
+        return bank
+
+    def accrue(self, token, debt):
+        '''Apply accrual given `debt`, the cToken borrowBalanceCurrent of the bank.
+        Return the fee added to the reserve.'''
+        bank = self.bank(token)
+        total_debt = bank.total_debt
+        if debt > total_debt:
+            fee = (debt - total_debt) * self.fee_bps // 10000
+            bank.total_debt = debt + fee  # doBorrow(fee) adds to the debt just set
+            bank.reserve += fee
+            return fee
+        bank.total_debt = debt
+        return 0
+
+    def borrow_balance_stored(self, position_id, token):
+        bank = self.bank(token)
+        return bank.debt_of(self.positions[position_id].debt_shares.get(bank.index, 0))
+
+    def get_position_debts(self, position_id):
+        pos = self.positions[position_id]
+        tokens = []
+        debts = []
+        for idx in pos.debt_indexes():
+            bank = self.banks[self.all_banks[idx]]
+            tokens.append(bank.token)
+            debts.append(ceil_div(pos.debt_shares.get(idx, 0) * bank.total_debt, bank.total_share))
+        return tokens, debts
+
+    def open_position(self, owner):
+        position_id = self.next_position_id
+        self.next_position_id += 1
+        self.positions[position_id] = Position(owner)
+        return position_id
+
+    def borrow(self, position_id, token, amount):
+        '''Borrow `amount` of `token` for the position, return the debt share minted.
+        Interest is assumed to be accrued already (the contract pokes the bank first).'''
+        bank = self.bank(token)
+        pos = self.positions[position_id]
+        total_share = bank.total_share
+        share = amount if total_share == 0 else ceil_div(amount * total_share, bank.total_debt)
+        bank.total_share += share
+        new_share = pos.debt_shares.get(bank.index, 0) + share
+        if new_share > 0:
+            pos.debt_shares[bank.index] = new_share
+            pos.debt_map |= 1 << bank.index
+        bank.total_debt += amount
+        return share
+
+    def repay(self, position_id, token, amount_call=MAX_UINT):
+        '''Repay debt of the position, MAX_UINT for all of it. Return (paid, share burned).'''
+        bank = self.bank(token)
+        pos = self.positions[position_id]
+        total_share = bank.total_share
+        total_debt = bank.total_debt
+        old_share = pos.debt_shares.get(bank.index, 0)
+        old_debt = ceil_div(old_share * total_debt, total_share)
+        if amount_call == MAX_UINT:
+            amount_call = old_debt
+        paid = amount_call
+        if paid > old_debt:
+            raise Exception('paid exceeds debt')
+        less_share = old_share if paid == old_debt else paid * total_share // total_debt
+        bank.total_share = sub(total_share, less_share)
+        bank.total_debt = sub(total_debt, paid)
+        new_share = sub(old_share, less_share)
+        if new_share == 0:
+            pos.debt_shares.pop(bank.index, None)
+            pos.debt_map &= ~(1 << bank.index)
+        else:
+            pos.debt_shares[bank.index] = new_share
+        return paid, less_share
+
+    def put_collateral(self, position_id, coll_token, coll_id, amount):
+        pos = self.positions[position_id]
+        if pos.coll_token != coll_token or pos.coll_id != coll_id:
+            if pos.collateral_size != 0:
+                raise Exception('another type of collateral already exists')
+            pos.coll_token = sys.intern(coll_token)
+            pos.coll_id = coll_id
+        pos.collateral_size += amount
+
+    def take_collateral(self, position_id, coll_token, coll_id, amount=MAX_UINT):
+        pos = self.positions[position_id]
+        if coll_token != pos.coll_token or coll_id != pos.coll_id:
+            raise Exception('invalid collateral token')
+        if amount == MAX_UINT:
+            amount = pos.collateral_size
+        pos.collateral_size = sub(pos.collateral_size, amount)
+        return amount
+
+    @classmethod
+    def from_chain(cls, homora):
+        '''Snapshot the state of a deployed HomoraBank (brownie contract object) into a model.'''
+        model = cls(homora.feeBps())
+        idx = 0
+        while True:
+            try:
+                token = str(homora.allBanks(idx))
+            except Exception:
+                break
+            bank = model.add_bank(token)
+            _, bank.index, bank.c_token, bank.reserve, bank.total_debt, bank.total_share = homora.banks(token)
+            bank.c_token = str(bank.c_token)
+            idx += 1
+        model.next_position_id = homora.nextPositionId()
+        for position_id in range(1, model.next_position_id):
+            owner, coll_token, coll_id, collateral_size, debt_map = homora.positions(position_id)
+            pos = Position(str(owner), str(coll_token), coll_id, collateral_size, debt_map)
+            for idx in pos.debt_indexes():
+                pos.debt_shares[idx] = homora.getPositionDebtShareOf(position_id, model.all_banks[idx])
+            model.positions[position_id] = pos
+        return model
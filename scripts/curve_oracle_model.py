@@ -0,0 +1,91 @@
+import json
+import os
+from pathlib import Path
+
+# CurveOracle off-chain. Pool metadata (poolOf and ulTokens) never changes once registerPool ran, so it
+# is read once per oracle and kept in .chain-cache; the decimals of each underlying are turned into
+# the divisor / multiplier getETHPx applies. Each block then needs one getETHPx per distinct
+# underlying and one get_virtual_price per pool, shared by all registered LP tokens.
+
+METADATA_PATH = Path(__file__).parent.parent / '.chain-cache' / 'curve-oracle.json'
+
+
+def scale(decimals):
+    '''Return (divisor, multiplier) normalizing a price of a token with `decimals` to 18 decimals.'''
+    if decimals < 18:
+        return 10**(18 - decimals), 1
+    return 1, 10**(decimals - 18)
+
+
+class CurveOracleModel:
+    def __init__(self, lps):
+        self.lps = lps  # lp -> (pool, [(underlying, decimals)])
+        self.scales = {
+            lp: [(token, *scale(decimals)) for token, decimals in tokens]
+            for lp, (_, tokens) in lps.items()
+        }
+
+    @property
+    def underlyings(self):
+        return sorted({token for _, tokens in self.lps.values() for token, _ in tokens})
+
+    @property
+    def pools(self):
+        return sorted({pool for pool, _ in self.lps.values()})
+
+    def prices(self, base_prices, virtual_prices):
+        '''Price every LP from base prices (token -> px) and pool virtual prices (pool -> price).
+        Return (lp -> px, lp -> error).'''
+        results = {}
+        errors = {}
+        for lp, tokens in self.scales.items():
+            try:
+                min_px = None
+                for token, divisor, multiplier in tokens:
+                    if token not in base_prices:
+                        raise Exception(f'no price for {token}')
+                    px = base_prices[token] // divisor * multiplier
+                    if min_px is None or px < min_px:
+                        min_px = px
+                if min_px is None:
+                    raise Exception('no min px')
+                results[lp] = min_px * virtual_prices[self.lps[lp][0]] // 10**18
+            except Exception as e:
+                errors[lp] = str(e)
+        return results, errors
+
+    def read_prices(self, source, interface):
+        '''Read base prices and virtual prices at the current block, one call per token and pool.'''
+        base_prices = {}
+        for token in self.underlyings:
+            try:
+                base_prices[token] = source.getETHPx(token)
+            except Exception:
+                pass
+        virtual_prices = {pool: interface.ICurvePool(pool).get_virtual_price() for pool in self.pools}
+        return self.prices(base_prices, virtual_prices)
+
+    @classmethod
+    def from_chain(cls, curve_oracle, lps, interface, path=METADATA_PATH):
+        '''Load the metadata of the registered `lps` of `curve_oracle`, reading only unknown ones.'''
+        key = str(curve_oracle.address)
+        cache = json.loads(path.read_text()) if path.exists() else {}
+        known = cache.setdefault(key, {})
+        missing = [lp for lp in lps if lp not in known]
+        if missing:
+            registry = interface.ICurveRegistry(curve_oracle.registry())
+            for lp in missing:
+                pool = str(curve_oracle.poolOf(lp))
+                if int(pool, 16) == 0:
+                    raise Exception('lp is not registered')
+                n, _ = registry.get_n_coins(pool)
+                tokens = []
+                for idx in range(n):
+                    decimals, token = curve_oracle.ulTokens(lp, idx)
+                    tokens.append((str(token), decimals))
+                known[lp] = [pool, tokens]
+            path.parent.mkdir(exist_ok=True)
+            tmp_path = path.with_suffix(f'.{os.getpid()}.tmp')
+            tmp_path.write_text(json.dumps(cache, indent=2, sort_keys=True))
+            tmp_path.replace(path)
+        return cls({lp: (known[lp][0], [tuple(token) for token in known[lp][1]]) for lp in lps})
@@ -0,0 +1,142 @@
+from brownie import accounts, interface
+from brownie import (
+    HomoraBank, ProxyOracle, CoreOracle, SimpleOracle, UniswapV2Oracle, BalancerPairOracle, CurveOracle,
+    UniswapV2SpellV1, SushiswapSpellV1, BalancerSpellV1, CurveSpellV1,
+    WERC20, WMasterChef, WStakingRewards, WLiquidityGauge, MockCErc20
+)
+from .utils import *
+
+# Shared mainnet-fork deployment: a HomoraBank backed by MockCErc20 banks, with oracles, wrappers
+# and spells for the Uniswap, Sushiswap, Balancer and Curve pools used by the fork scripts.
+# Banks use MockCErc20 so that results do not depend on live Cream market state.
+
+UNI_ROUTER = '0x7a250d5630B4cF539739dF2C5dAcb4c659F2488D'
+SUSHI_ROUTER = '0xd9e1ce17f2641f24ae83637ab66a2cca9c378b9f'
+MASTERCHEF = '0xc2edad668740f1aa35e4d8f227fb8e17dca888cd'
+UNI_DPI_STAKING = '0xB93b505Ed567982E2b6756177ddD23ab5745f309'
+BAL_DFD_DUSD_STAKING = '0xf068236ecad5fabb9883bbb26a6445d6c7c9a924'
+CRV_REGISTRY = '0x7d86446ddb609ed0f5f8684acf30380a356b2b4c'
+
+UNI_USDT_WETH = '0x0d4a11d5eeaac28ec3f61d100daf4d40471f1852'
+UNI_USDC_USDT = '0x3041cbd36888becc7bbcbc0045e3b1f144466f5f'
+UNI_DPI_WETH = '0x4d5ef58aac27d99935e5b6b4a6778ff292059991'
+SUSHI_USDT_WETH = '0x06da0fd433C1A5d7a4faa01111c044910A184553'
+BAL_DAI_WETH = '0x8b6e6e7b5b3801fed2cafd4b22b8a16c2f2db21a'
+BAL_DFD_DUSD = '0xd8e9690eff99e21a2de25e0b148ffaf47f47c972'
+CRV_REN_WBTC = '0x49849C98ae39Fff122806C06791Fa73784FB3675'  # pid 9
+CRV_3POOL = '0x6c3f90f043a72fa612cbac8115ee7e52bde6e490'  # pid 0
+CRV_SUSD = '0xC25a3A3b969415c80451098fa907EC722572917F'  # pid 12
+
+# token -> (ETH per whole token, decimals)
+PRICES = {
+    WETH: (1, 18),
+    USDT: (1 / 700, 6),
+    USDC: (1 / 700, 6),
+    DAI: (1 / 700, 18),
+    SUSD: (1 / 700, 18),
+    DPI: (1 / 7, 18),
+    WBTC: (30, 8),
+    RENBTC: (30, 8),
+    DFD: (1 / 2 / 700, 18),
+    DUSD: (2 / 700, 18),
+}
+
+
+def eth_px(eth_per_token, decimals):
+    return int(2**112 * eth_per_token * 10**18) // 10**decimals
+
+
+def deploy():
+    admin = accounts[0]
+    alice = accounts[1]
+    bob = accounts[2]
+    tokens = {addr: interface.IERC20Ex(addr) for addr in PRICES}
+    uniswap_lps = [UNI_USDT_WETH, UNI_USDC_USDT, UNI_DPI_WETH, SUSHI_USDT_WETH]
+    balancer_lps = [BAL_DAI_WETH, BAL_DFD_DUSD]
+    curve_lps = [CRV_REN_WBTC, CRV_3POOL, CRV_SUSD]
+    lps = uniswap_lps + balancer_lps + curve_lps
+
+    werc20 = WERC20.deploy({'from': admin})
+    wchef = WMasterChef.deploy(MASTERCHEF, {'from': admin})
+    reward = interface.IStakingRewardsEx(UNI_DPI_STAKING).rewardsToken()
+    wstaking = WStakingRewards.deploy(UNI_DPI_STAKING, UNI_DPI_WETH, reward, {'from': admin})
+    bal_wstaking = WStakingRewards.deploy(BAL_DFD_DUSD_STAKING, BAL_DFD_DUSD, DFD, {'from': admin})
+    wgauge = WLiquidityGauge.deploy(CRV_REGISTRY, CRV, {'from': admin})
+    for pid in (0, 9, 12):
+        wgauge.registerGauge(pid, 0, {'from': admin})
+
+    simple_oracle = SimpleOracle.deploy({'from': admin})
+    simple_oracle.setETHPx(list(PRICES), [eth_px(*PRICES[token]) for token in PRICES], {'from': admin})
+    uniswap_oracle = UniswapV2Oracle.deploy(simple_oracle, {'from': admin})
+    balancer_oracle = BalancerPairOracle.deploy(simple_oracle, {'from': admin})
+    curve_oracle = CurveOracle.deploy(simple_oracle, CRV_REGISTRY, {'from': admin})
+    for lp in curve_lps:
+        curve_oracle.registerPool(lp, {'from': admin})
+    core_oracle = CoreOracle.deploy({'from': admin})
+    core_oracle.setRoute(
+        list(PRICES) + lps,
+        [simple_oracle] * len(PRICES) + [uniswap_oracle] * len(uniswap_lps) +
+        [balancer_oracle] * len(balancer_lps) + [curve_oracle] * len(curve_lps),
+        {'from': admin},
+    )
+    oracle = ProxyOracle.deploy(core_oracle, {'from': admin})
+    oracle.setWhitelistERC1155([werc20, wchef, wstaking, bal_wstaking, wgauge], True, {'from': admin})
+    oracle.setTokenFactors(
+        list(PRICES) + lps,
+        [[10000, 10000, 10500]] * (len(PRICES) + len(lps)),
+        {'from': admin},
+    )
+
+    homora = HomoraBank.deploy({'from': admin})
+    homora.initialize(oracle, 1000, {'from': admin})  # 10% fee
+    for token in tokens.values():
+        cr_token = MockCErc20.deploy(token, {'from': admin})
+        mint_tokens(token, cr_token, 10**6 * 10**token.decimals())
+        homora.addBank(token, cr_token, {'from': admin})
+    homora.setWhitelistTokens(list(tokens), [True] * len(tokens), {'from': admin})
+
+    uniswap_spell = UniswapV2SpellV1.deploy(homora, werc20, UNI_ROUTER, {'from': admin})
+    sushiswap_spell = SushiswapSpellV1.deploy(homora, werc20, SUSHI_ROUTER, wchef, {'from': admin})
+    balancer_spell = BalancerSpellV1.deploy(homora, werc20, WETH, {'from': admin})
+    curve_spell = CurveSpellV1.deploy(homora, werc20, WETH, wgauge, {'from': admin})
+    spells = [uniswap_spell, sushiswap_spell, balancer_spell, curve_spell]
+    homora.setWhitelistSpells(spells, [True] * len(spells), {'from': admin})
+    uniswap_spell.setWhitelistLPTokens([UNI_USDT_WETH, UNI_USDC_USDT, UNI_DPI_WETH], [True] * 3, {'from': admin})
+    sushiswap_spell.setWhitelistLPTokens([SUSHI_USDT_WETH], [True], {'from': admin})
+    balancer_spell.setWhitelistLPTokens(balancer_lps, [True] * len(balancer_lps), {'from': admin})
+    curve_spell.setWhitelistLPTokens(curve_lps, [True] * len(curve_lps), {'from': admin})
+
+    # first time calls, so that one-off pair lookups and approvals are not measured
+    uniswap_spell.getAndApprovePair(USDT, WETH, {'from': admin})
+    uniswap_spell.getAndApprovePair(USDC, USDT, {'from': admin})
+    uniswap_spell.getAndApprovePair(DPI, WETH, {'from': admin})
+    sushiswap_spell.getAndApprovePair(USDT, WETH, {'from': admin})
+    for lp in balancer_lps:
+        balancer_spell.getAndApprovePair(lp, {'from': admin})
+    for lp, n in ((CRV_REN_WBTC, 2), (CRV_3POOL, 3), (CRV_SUSD, 4)):
+        curve_spell.getPool(lp, {'from': admin})
+        curve_spell.ensureApproveN(lp, n, {'from': admin})
+
+    for user in (alice, bob):
+        for token in tokens.values():
+            amount = 10 * 10**18 if token == WETH else 10**5 * 10**token.decimals()
+            mint_tokens(token, user, amount)
+            token.approve(homora, 0, {'from': user})
+            token.approve(homora, 2**256-1, {'from': user})
+
+    return {
+        'admin': admin,
+        'alice': alice,
+        'bob': bob,
+        'homora': homora,
+        'oracle': oracle,
+        'werc20': werc20,
+        'wchef': wchef,
+        'wstaking': wstaking,
+        'bal_wstaking': bal_wstaking,
+        'wgauge': wgauge,
+        'uniswap_spell': uniswap_spell,
+        'sushiswap_spell': sushiswap_spell,
+        'balancer_spell': balancer_spell,
+        'curve_spell': curve_spell,
+    }
@@ -0,0 +1,164 @@
+import json
+from pathlib import Path
+
+from brownie import chain
+from .fork_world import *
+
+# Gas regression benchmark for HomoraBank.execute paths, run on a mainnet fork.
+#   brownie run gas_benchmark --network mainnet-fork         # compare against the baseline
+#   brownie run gas_benchmark record --network mainnet-fork  # (re)write the baseline
+# The deployment is shared with the scenario runner, see fork_world.py.
+
+BASELINE_PATH = Path(__file__).parent / 'gas_baseline.json'
+BASELINE_VERSION = 1  # Bump when paths or amounts change in a way that invalidates old numbers.
+DEFAULT_THRESHOLD = 0.02  # Max allowed relative gas increase per path.
+
+
+def run_paths(env):
+    alice = env['alice']
+    bob = env['bob']
+    homora = env['homora']
+    uniswap_spell = env['uniswap_spell']
+    sushiswap_spell = env['sushiswap_spell']
+    balancer_spell = env['balancer_spell']
+    curve_spell = env['curve_spell']
+    wstaking = env['wstaking']
+    gas = {}
+
+    def execute(name, pos_id, spell, data):
+        tx = homora.execute(pos_id, spell, data, {'from': alice})
+        gas[name] = tx.gas_used
+        print(f'{name:<45} {tx.gas_used:>10}')
+        return tx.return_value
+
+    def coll_size(pos_id):
+        return homora.getPositionInfo(pos_id)[3]
+
+    # Uniswap + WERC20
+    uni_pos = execute('uniswap.addLiquidityWERC20', 0, uniswap_spell,
+                      uniswap_spell.addLiquidityWERC20.encode_input(
+                          USDT, WETH, [1000 * 10**6, 10**17, 0, 1000 * 10**6, 0, 0, 0, 0]))
+    execute('uniswap.removeLiquidityWERC20', uni_pos, uniswap_spell,
+            uniswap_spell.removeLiquidityWERC20.encode_input(
+                USDT, WETH, [coll_size(uni_pos) // 2, 0, homora.borrowBalanceStored(uni_pos, USDT) // 2,
+                             0, 0, 0, 0]))
+
+    # Uniswap + WStakingRewards
+    uni_staking_pos = execute('uniswap.addLiquidityWStakingRewards', 0, uniswap_spell,
+                              uniswap_spell.addLiquidityWStakingRewards.encode_input(
+                                  DPI, WETH, [10 * 10**18, 10**17, 0, 10**18, 0, 0, 0, 0], wstaking))
+    execute('uniswap.removeLiquidityWStakingRewards', uni_staking_pos, uniswap_spell,
+            uniswap_spell.removeLiquidityWStakingRewards.encode_input(
+                DPI, WETH, [2**256-1, 0, 2**256-1, 0, 0, 0, 0], wstaking))
+
+    # Sushiswap + WMasterChef
+    sushi_pos = execute('sushiswap.addLiquidityWMasterChef', 0, sushiswap_spell,
+                        sushiswap_spell.addLiquidityWMasterChef.encode_input(
+                            USDT, WETH, [1000 * 10**6, 10**17, 0, 500 * 10**6, 0, 0, 0, 0], 0))
+    execute('sushiswap.removeLiquidityWMasterChef', sushi_pos, sushiswap_spell,
+            sushiswap_spell.removeLiquidityWMasterChef.encode_input(
+                USDT, WETH, [2**256-1, 0, 2**256-1, 0, 0, 0, 0]))
+
+    # Balancer + WERC20
+    bal_pos = execute('balancer.addLiquidityWERC20', 0, balancer_spell,
+                      balancer_spell.addLiquidityWERC20.encode_input(
+                          BAL_DAI_WETH, [1000 * 10**18, 10**17, 0, 500 * 10**18, 0, 0, 0]))
+    execute('balancer.removeLiquidityWERC20', bal_pos, balancer_spell,
+            balancer_spell.removeLiquidityWERC20.encode_input(
+                BAL_DAI_WETH, [2**256-1, 0, 2**256-1, 0, 0, 0, 0]))
+
+    # Curve + WLiquidityGauge
+    crv2_pos = execute('curve.addLiquidity2', 0, curve_spell,
+                       curve_spell.addLiquidity2.encode_input(
+                           CRV_REN_WBTC, [10**7, 10**7], 0, [0, 10**6], 0, 0, 9, 0))
+    crv3_pos = execute('curve.addLiquidity3', 0, curve_spell,
+                       curve_spell.addLiquidity3.encode_input(
+                           CRV_3POOL, [200 * 10**18, 500 * 10**6, 400 * 10**6], 0,
+                           [10 * 10**18, 20 * 10**6, 10 * 10**6], 0, 0, 0, 0))
+    crv4_pos = execute('curve.addLiquidity4', 0, curve_spell,
+                       curve_spell.addLiquidity4.encode_input(
+                           CRV_SUSD, [200 * 10**18, 1000 * 10**6, 1000 * 10**6, 1000 * 10**18], 0,
+                           [0, 100 * 10**6, 0, 0], 0, 0, 12, 0))
+    execute('curve.removeLiquidity2', crv2_pos, curve_spell,
+            curve_spell.removeLiquidity2.encode_input(
+                CRV_REN_WBTC, 2**256-1, 0, [0, 2**256-1], 0, [0, 0]))
+    execute('curve.removeLiquidity3', crv3_pos, curve_spell,
+            curve_spell.removeLiquidity3.encode_input(
+                CRV_3POOL, 2**256-1, 0, [2**256-1] * 3, 0, [0, 0, 0]))
+    execute('curve.removeLiquidity4', crv4_pos, curve_spell,
+            curve_spell.removeLiquidity4.encode_input(
+                CRV_SUSD, 2**256-1, 0, [0, 2**256-1, 0, 0], 0, [0, 0, 0, 0]))
+
+    # accrue
+    chain.sleep(86400)
+    tx = homora.accrue(USDT, {'from': bob})
+    gas['bank.accrue'] = tx.gas_used
+    print(f'{"bank.accrue":<45} {tx.gas_used:>10}')
+
+    # liquidate the remaining half of the Uniswap WERC20 position
+    env['oracle'].setTokenFactors([UNI_USDT_WETH], [[10000, 100, 10500]], {'from': env['admin']})
+    tx = homora.liquidate(uni_pos, USDT, homora.borrowBalanceStored(uni_pos, USDT) // 2, {'from': bob})
+    gas['bank.liquidate'] = tx.gas_used
+    print(f'{"bank.liquidate":<45} {tx.gas_used:>10}')
+
+    return gas
+
+
+def load_baseline():
+    '''Return the recorded baseline, or None if there is none yet.'''
+    if not BASELINE_PATH.exists():
+        return None
+    try:
+        baseline = json.loads(BASELINE_PATH.read_text())
+    except ValueError as e:
+        raise Exception(f'unreadable baseline {BASELINE_PATH}: {e}')
+    if baseline.get('version') != BASELINE_VERSION:
+        raise Exception(f'baseline version {baseline.get("version")} != {BASELINE_VERSION}, record it again')
+    return baseline
+
+
+def compare(baseline, gas):
+    threshold = baseline.get('threshold', DEFAULT_THRESHOLD)
+    regressions = []
+    for name, used in gas.items():
+        base = baseline['paths'].get(name)
+        if base is None:
+            print(f'{name:<45} {used:>10}  (new path)')
+            continue
+        delta = (used - base) / base
+        status = 'REGRESSION' if delta > threshold else 'improved' if delta < -threshold else 'ok'
+        print(f'{name:<45} {base:>10} -> {used:>10} {delta:>+8.2%}  {status}')
+        if delta > threshold:
+            regressions.append(name)
+    for name in baseline['paths']:
+        if name not in gas:
+            print(f'{name:<45} missing from this run')
+    return regressions
+
+
+def write_baseline(gas):
+    baseline = {
+        'version': BASELINE_VERSION,
+        'threshold': DEFAULT_THRESHOLD,
+        'block': chain.height,
+        'paths': gas,
+    }
+    BASELINE_PATH.write_text(json.dumps(baseline, indent=2, sort_keys=True) + '\n')
+    print(f'baseline written to {BASELINE_PATH}')
+
+
+def record():
+    write_baseline(run_paths(deploy()))
+
+
+def main():
+    baseline = load_baseline()
+    gas = run_paths(deploy())
+    if baseline is None:
+        print('no baseline yet, this run is the baseline')
+        write_baseline(gas)
+        print('commit it so that later runs are compared against it')
+        return
+    print('=========================================================================')
+    regressions = compare(baseline, gas)
+    assert not regressions, f'gas regressed beyond threshold: {", ".join(regressions)}'
@@ -0,0 +1,149 @@
+from collections import defaultdict
+from pathlib import Path
+
+from brownie import chain, web3
+from brownie.network.state import _find_contract
+
+# Per-call gas breakdown of a transaction, from the node's debug trace.
+# Every internal call (execute -> HomoraCaster.cast -> spell -> bank callbacks -> oracles ...)
+# becomes a frame, and the output is a folded stack file for flamegraph.pl or speedscope.
+#   brownie run gas_profile main <txid> --network <persistent local network>
+# or, from a test or another script, `profile(tx)` on a transaction just sent.
+
+CALL_OPS = {'CALL', 'CALLCODE', 'DELEGATECALL', 'STATICCALL', 'CREATE', 'CREATE2'}
+
+
+def word(value):
+    return int(value, 16)
+
+
+def read_memory(memory, offset, size):
+    data = ''.join(w[2:] if w.startswith('0x') else w for w in memory)
+    return data[offset * 2:(offset + size) * 2]
+
+
+def call_target(log):
+    '''Return (address, selector) of the call made by a CALL* step. The selector is None when the
+    trace has no memory to read it from.'''
+    stack = log['stack']
+    if log['op'].startswith('CREATE'):
+        return None, 'constructor'
+    address = '0x' + hex(word(stack[-2]))[2:].zfill(40)[-40:]
+    if log['op'] in ('CALL', 'CALLCODE'):
+        args_offset, args_size = word(stack[-4]), word(stack[-5])
+    else:
+        args_offset, args_size = word(stack[-3]), word(stack[-4])
+    if args_size and not log.get('memory'):
+        return address, None
+    selector = read_memory(log.get('memory') or [], args_offset, min(args_size, 4))
+    return address, selector
+
+
+def frame_name(address, selector):
+    if address is None:
+        return f'<create>.{selector}'
+    if int(address, 16) < 10:
+        return f'<precompile {int(address, 16)}>'
+    contract = _find_contract(address)
+    if selector is None:
+        return f'{contract._name if contract else address}.<unknown>'
+    if contract is None:
+        return f'{address}.0x{selector}' if selector else f'{address}.<fallback>'
+    if not selector:
+        return f'{contract._name}.<fallback>'
+    try:
+        fn = contract.get_method('0x' + selector.ljust(8, '0'))
+    except Exception:
+        fn = None
+    return f'{contract._name}.{fn or "0x" + selector}'
+
+
+def trace_frames(tx):
+    '''Walk the struct logs of `tx` and return ({stack tuple: self gas}, {frame name: calls}).'''
+    trace = web3.provider.make_request(
+        'debug_traceTransaction',
+        # enableMemory for current geth and anvil, disableMemory for older nodes
+        [tx.txid, {'disableStorage': True, 'enableMemory': True, 'disableMemory': False, 'disableStack': False}],
+    )
+    if 'error' in trace:
+        raise RuntimeError(f'debug_traceTransaction failed: {trace["error"]}')
+    logs = trace['result']['structLogs']
+
+    root = frame_name(tx.receiver, tx.input[2:10]) if tx.receiver else frame_name(None, 'constructor')
+    self_gas = defaultdict(int)
+    calls = defaultdict(int)
+    calls[root] += 1
+    # each frame: [name, gas left when called, gas used by returned children]
+    frames = [[root, logs[0]['gas'] if logs else 0, 0]]
+    pending = None  # (name, gas left at the call step) of a CALL* whose child has not started yet
+
+    for log in logs:
+        depth = log['depth']
+        if pending is not None:
+            if depth == len(frames) + 1:
+                frames.append([pending[0], pending[1], 0])
+            else:
+                # call into an account without code, or a precompile: no steps of its own
+                cost = pending[1] - log['gas']
+                self_gas[tuple(f[0] for f in frames) + (pending[0],)] += cost
+                frames[-1][2] += cost
+            calls[pending[0]] += 1
+            pending = None
+        while depth < len(frames):
+            name, gas_in, children = frames.pop()
+            inclusive = gas_in - log['gas']
+            self_gas[tuple(f[0] for f in frames) + (name,)] += inclusive - children
+            frames[-1][2] += inclusive
+        if log['op'] in CALL_OPS:
+            pending = (frame_name(*call_target(log)), log['gas'])
+
+    if logs:
+        end_gas = logs[-1]['gas'] - logs[-1]['gasCost']
+        while len(frames) > 1:
+            name, gas_in, children = frames.pop()
+            inclusive = gas_in - end_gas
+            self_gas[tuple(f[0] for f in frames) + (name,)] += inclusive - children
+            frames[-1][2] += inclusive
+        name, gas_in, children = frames[0]
+        self_gas[(name,)] += gas_in - end_gas - children
+        # intrinsic gas, calldata and the refund are outside of the struct logs
+        self_gas[(name, '<intrinsic & refund>')] += tx.gas_used - (gas_in - end_gas)
+    return dict(self_gas), dict(calls)
+
+
+def summarize(self_gas, calls):
+    '''Return {frame name: (calls, inclusive gas)} aggregated over all call paths.'''
+    inclusive = defaultdict(int)
+    for stack, gas in self_gas.items():
+        for depth in range(1, len(stack) + 1):
+            inclusive[stack[:depth]] += gas
+    total = defaultdict(int)
+    for stack, gas in inclusive.items():
+        # a frame nested in itself is only counted at its outermost occurrence
+        if stack[-1] not in stack[:-1]:
+            total[stack[-1]] += gas
+    return {name: (calls.get(name, 0), gas) for name, gas in total.items()}
+
+
+def write_folded(self_gas, path):
+    with open(path, 'w') as f:
+        for stack, gas in sorted(self_gas.items()):
+            if gas > 0:
+                f.write(';'.join(stack).replace(' ', '_') + f' {gas}\n')
+
+
+def profile(tx, path=None, top=30):
+    self_gas, calls = trace_frames(tx)
+    path = Path(path or f'gas-profile-{tx.txid[:10]}.folded')
+    write_folded(self_gas, path)
+
+    print(f'{"frame":<60} {"calls":>6} {"gas":>10} {"%":>7}')
+    summary = sorted(summarize(self_gas, calls).items(), key=lambda item: -item[1][1])
+    for name, (calls, gas) in summary[:top]:
+        print(f'{name:<60} {calls:>6} {gas:>10} {gas / tx.gas_used:>7.2%}')
+    print(f'total gas used: {tx.gas_used}, folded stacks written to {path}')
+    return self_gas
+
+
+def main(txid, path=None):
+    return profile(chain.get_transaction(txid), path)
@@ -0,0 +1,165 @@
+from collections import defaultdict
+
+from .bank_model import ZERO_ADDRESS, ceil_div
+
+# Batch collateral and borrow ETH values for a whole position book, reproducing
+# HomoraBank.getCollateralETHValue/getBorrowETHValue on top of ProxyOracle.asETHCollateral/asETHBorrow.
+# Values are exact uint256 results, so they are computed on Python ints: positions are grouped into
+# one column per collateral (token, id) and one per debt bank, the oracle terms of each column are
+# looked up once, and the column is evaluated in a single comprehension.
+
+
+class OracleSnapshot:
+    '''ProxyOracle state and source prices at one block.'''
+
+    def __init__(self, prices, token_factors, whitelist_erc1155, underlyings):
+        self.prices = prices  # token -> source.getETHPx(token), ETH per token times 2**112
+        self.token_factors = token_factors  # token -> (borrowFactor, collateralFactor, liqIncentive)
+        self.whitelist_erc1155 = set(whitelist_erc1155)
+        self.underlyings = underlyings  # (ERC1155 token, id) -> (underlying token, rate times 2**112)
+
+    def price(self, token):
+        px = self.prices.get(token)
+        if px is None:
+            raise Exception(f'no price for {token}')
+        return px
+
+    def factors(self, token, message):
+        factors = self.token_factors.get(token)
+        if factors is None or factors[2] == 0:
+            raise Exception(message)
+        return factors
+
+    def collateral_terms(self, token, id):
+        '''Return (rate, px, collateralFactor) used by asETHCollateral for (token, id).'''
+        if token not in self.whitelist_erc1155:
+            raise Exception('bad token')
+        underlying, rate = self.underlyings[(token, id)]
+        _, collateral_factor, _ = self.factors(underlying, 'bad underlying collateral')
+        return rate, self.price(underlying), collateral_factor
+
+    def borrow_terms(self, token):
+        '''Return (px, borrowFactor) used by asETHBorrow for token.'''
+        borrow_factor, _, _ = self.factors(token, 'bad underlying borrow')
+        return self.price(token), borrow_factor
+
+    def as_eth_collateral(self, token, id, amount):
+        rate, px, collateral_factor = self.collateral_terms(token, id)
+        return (px * (amount * rate >> 112) >> 112) * collateral_factor // 10000
+
+    def as_eth_borrow(self, token, amount):
+        px, borrow_factor = self.borrow_terms(token)
+        return (px * amount >> 112) * borrow_factor // 10000
+
+    def convert_for_liquidation(self, token_in, token_out, token_out_id, amount_in):
+        '''Amount of ERC1155 `token_out` paid as bounty for repaying `amount_in` of `token_in`.'''
+        if token_out not in self.whitelist_erc1155:
+            raise Exception('bad token')
+        underlying_out, rate = self.underlyings[(token_out, token_out_id)]
+        _, _, liq_in = self.factors(token_in, 'bad underlying in')
+        _, _, liq_out = self.factors(underlying_out, 'bad underlying out')
+        amount_out = amount_in * self.price(token_in) // self.price(underlying_out)
+        amount_out = amount_out * 2**112 // rate
+        return amount_out * liq_in * liq_out // (10000 * 10000)
+
+    @classmethod
+    def from_chain(cls, oracle, model, interface):
+        '''Read the oracle terms needed to evaluate every position of `model`.'''
+        tokens = set(model.all_banks)
+        underlyings = {}
+        wrappers = set()
+        for pos in model.positions.values():
+            key = (pos.coll_token, pos.coll_id)
+            if pos.coll_token == ZERO_ADDRESS or key in underlyings:
+                continue
+            wrappers.add(pos.coll_token)
+            wrapper = interface.IERC20Wrapper(pos.coll_token)
+            underlying = str(wrapper.getUnderlyingToken(pos.coll_id))
+            underlyings[key] = (underlying, wrapper.getUnderlyingRate(pos.coll_id))
+            tokens.add(underlying)
+        source = interface.IBaseOracle(oracle.source())
+        prices = {}
+        for token in tokens:
+            try:
+                prices[token] = source.getETHPx(token)
+            except Exception:
+                pass
+        return cls(
+            prices,
+            {token: tuple(oracle.tokenFactors(token)) for token in tokens},
+            [wrapper for wrapper in wrappers if oracle.whitelistERC1155(wrapper)],
+            underlyings,
+        )
+
+
+class Health:
+    '''Collateral and borrow ETH values of a list of positions.'''
+
+    def __init__(self, ids, collateral, borrow, errors):
+        self.ids = ids
+        self.collateral = collateral
+        self.borrow = borrow
+        self.errors = errors  # position id -> revert message of the value calls
+
+    def liquidatable(self):
+        '''Ids of positions HomoraBank.liquidate accepts (collateral value < borrow value).'''
+        return [
+            pos_id for pos_id, coll, debt in zip(self.ids, self.collateral, self.borrow)
+            if coll < debt and pos_id not in self.errors
+        ]
+
+
+def collateral_values(model, oracle, ids):
+    values = [0] * len(ids)
+    errors = {}
+    columns = defaultdict(list)
+    for i, pos_id in enumerate(ids):
+        pos = model.positions[pos_id]
+        if pos.collateral_size:
+            columns[(pos.coll_token, pos.coll_id)].append(i)
+    for (token, id), rows in columns.items():
+        try:
+            if token == ZERO_ADDRESS:
+                raise Exception('bad collateral token')
+            rate, px, collateral_factor = oracle.collateral_terms(token, id)
+        except Exception as e:
+            errors.update((ids[i], str(e)) for i in rows)
+            continue
+        sizes = [model.positions[ids[i]].collateral_size for i in rows]
+        for i, value in zip(rows, [(px * (size * rate >> 112) >> 112) * collateral_factor // 10000
+                                   for size in sizes]):
+            values[i] = value
+    return values, errors
+
+
+def borrow_values(model, oracle, ids):
+    values = [0] * len(ids)
+    errors = {}
+    columns = defaultdict(list)  # bank index -> [(row, debt share)]
+    for i, pos_id in enumerate(ids):
+        pos = model.positions[pos_id]
+        for idx in pos.debt_indexes():
+            columns[idx].append((i, pos.debt_shares.get(idx, 0)))
+    for idx, column in columns.items():
+        bank = model.banks[model.all_banks[idx]]
+        try:
+            px, borrow_factor = oracle.borrow_terms(bank.token)
+        except Exception as e:
+            errors.update((ids[i], str(e)) for i, _ in column)
+            continue
+        total_debt = bank.total_debt
+        total_share = bank.total_share
+        for (i, _), value in zip(column, [
+            (px * ceil_div(share * total_debt, total_share) >> 112) * borrow_factor // 10000
+            for _, share in column
+        ]):
+            values[i] += value
+    return values, errors
+
+
+def evaluate(model, oracle, ids=None):
+    '''Evaluate the positions `ids` of `model` (all of them by default) against `oracle`.'''
+    ids = list(model.positions) if ids is None else list(ids)
+    collateral, collateral_errors = collateral_values(model, oracle, ids)
+    borrow, borrow_errors = borrow_values(model, oracle, ids)
+    return Health(ids, collateral, borrow, {**borrow_errors, **collateral_errors})
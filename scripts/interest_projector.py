@@ -0,0 +1,126 @@
+from .bank_model import ceil_div
+from .health_engine import collateral_values
+
+# Projects bank debt forward in time. A cToken interest model gives the bank's cToken borrow balance
+# after each step, and HomoraBank.accrue is applied to it: feeBps of the interest is borrowed on top
+# as reserve, so totalDebt grows by interest plus fee. Positions hold fixed debt shares, so their
+# debt at each step is ceilDiv(share * totalDebt, totalShare). Every bank is projected as one column
+# over the time grid; each grid point is one accrue, which is what compounds the interest.
+
+YEAR = 365 * 24 * 60 * 60
+
+
+class LinearInterest:
+    '''MockCErc20: simple interest since the last accrue at interestPerYear (1e18 = 100%).'''
+
+    def __init__(self, interest_per_year=10 * 10**16):
+        self.interest_per_year = interest_per_year
+
+    def debt_after(self, debt, seconds):
+        return debt + debt * self.interest_per_year // (100 * 10**16) * seconds // YEAR
+
+
+class UtilizationInterest:
+    '''IInterestRateModel-style curve: getBorrowRate in bps per year from utilization
+    borrow / (supply + borrow - reserve), with a steeper slope above the kink. The market supply and
+    reserve stay fixed and the market borrow grows with the interest of the bank.'''
+
+    def __init__(self, supply, borrow, reserve, base_bps, slope_bps, jump_bps, kink_bps=8000):
+        self.supply = supply
+        self.borrow = borrow
+        self.reserve = reserve
+        self.base_bps = base_bps
+        self.slope_bps = slope_bps
+        self.jump_bps = jump_bps
+        self.kink_bps = kink_bps
+
+    def borrow_rate(self):
+        total = self.supply + self.borrow - self.reserve
+        util_bps = self.borrow * 10000 // total if total else 0
+        rate = self.base_bps + min(util_bps, self.kink_bps) * self.slope_bps // 10000
+        if util_bps > self.kink_bps:
+            rate += (util_bps - self.kink_bps) * self.jump_bps // 10000
+        return rate
+
+    def debt_after(self, debt, seconds):
+        interest = debt * self.borrow_rate() // 10000 * seconds // YEAR
+        self.borrow += interest
+        return debt + interest
+
+
+def project_bank(bank, fee_bps, interest, times):
+    '''Return (totalDebt, reserve) after accruing at each of the sorted `times` (seconds from now).'''
+    total_debts = []
+    reserves = []
+    total_debt = bank.total_debt
+    reserve = bank.reserve
+    now = 0
+    for t in times:
+        debt = interest.debt_after(total_debt, t - now)
+        if debt > total_debt:
+            fee = (debt - total_debt) * fee_bps // 10000
+            debt += fee
+            reserve += fee
+        total_debt = debt
+        total_debts.append(total_debt)
+        reserves.append(reserve)
+        now = t
+    return total_debts, reserves
+
+
+class Projection:
+    def __init__(self, times, total_debts, reserves):
+        self.times = times
+        self.total_debts = total_debts  # token -> [totalDebt at each time]
+        self.reserves = reserves  # token -> [reserve at each time]
+
+    def position_debts(self, model, position_id):
+        '''token -> [debt of the position at each time].'''
+        pos = model.positions[position_id]
+        debts = {}
+        for idx in pos.debt_indexes():
+            bank = model.banks[model.all_banks[idx]]
+            share = pos.debt_shares.get(idx, 0)
+            debts[bank.token] = [ceil_div(share * total_debt, bank.total_share)
+                                 for total_debt in self.total_debts[bank.token]]
+        return debts
+
+
+def project(model, interests, times):
+    '''Project every bank of `model` over `times`; `interests` maps token -> interest model.'''
+    times = sorted(times)
+    total_debts = {}
+    reserves = {}
+    for token in model.all_banks:
+        total_debts[token], reserves[token] = project_bank(model.banks[token], model.fee_bps,
+                                                           interests[token], times)
+    return Projection(times, total_debts, reserves)
+
+
+def liquidation_times(model, oracle, projection, ids=None):
+    '''First projected time at which each position turns liquidatable at the current prices,
+    for the positions that do within the grid.'''
+    ids = list(model.positions) if ids is None else list(ids)
+    collateral, errors = collateral_values(model, oracle, ids)
+    terms = {}
+    for token in model.all_banks:
+        try:
+            terms[token] = oracle.borrow_terms(token)
+        except Exception:
+            pass
+    crossings = {}
+    for pos_id, coll in zip(ids, collateral):
+        if pos_id in errors:
+            continue
+        debts = projection.position_debts(model, pos_id)
+        if not debts or any(token not in terms for token in debts):
+            continue
+        for step, t in enumerate(projection.times):
+            borrow = 0
+            for token, column in debts.items():
+                px, borrow_factor = terms[token]
+                borrow += (px * column[step] >> 112) * borrow_factor // 10000
+            if coll < borrow:
+                crossings[pos_id] = t
+                break
+    return crossings
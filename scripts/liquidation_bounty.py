@@ -0,0 +1,79 @@
+from collections import defaultdict
+
+from .bank_model import MAX_UINT, ZERO_ADDRESS
+from .health_engine import evaluate
+
+# Batch liquidation bounties, reproducing HomoraBank.liquidate: the repaid amount (amountCall, or the
+# whole debt for MAX_UINT), ProxyOracle.convertForLiquidation on it, and the min with collateralSize.
+# Candidates are grouped by (debt token, collateral token, collateral id) so the oracle terms of each
+# group are looked up once. Each result also carries the ETH value of what is repaid and received,
+# at source prices, so candidates can be ranked by profit.
+
+
+def liquidation_terms(oracle, token_in, token_out, token_out_id):
+    '''Return (pxIn, pxOut, rate, liqIncentive in * liqIncentive out) as read by convertForLiquidation.'''
+    if token_out == ZERO_ADDRESS:
+        raise Exception('bad collateral token')
+    if token_out not in oracle.whitelist_erc1155:
+        raise Exception('bad token')
+    underlying_out, rate = oracle.underlyings[(token_out, token_out_id)]
+    _, _, liq_in = oracle.factors(token_in, 'bad underlying in')
+    _, _, liq_out = oracle.factors(underlying_out, 'bad underlying out')
+    return oracle.price(token_in), oracle.price(underlying_out), rate, liq_in * liq_out
+
+
+def bounties(model, oracle, candidates):
+    '''Evaluate (position id, debt token, amountCall) candidates against the current book.
+    Each candidate is evaluated on its own, as if it were the next liquidation in the block.'''
+    candidates = list(candidates)
+    health = evaluate(model, oracle, {pos_id for pos_id, _, _ in candidates})
+    healthy = {
+        pos_id: health.errors.get(pos_id, 'position still healthy')
+        for pos_id, coll, borrow in zip(health.ids, health.collateral, health.borrow)
+        if pos_id in health.errors or coll >= borrow
+    }
+    results = [None] * len(candidates)
+    groups = defaultdict(list)  # (debt token, collateral token, collateral id) -> [(row, paid)]
+    for i, (pos_id, token, amount_call) in enumerate(candidates):
+        result = {'position': pos_id, 'token': token, 'paid': 0, 'bounty': 0, 'cost': 0, 'value': 0,
+                  'profit': 0, 'error': None}
+        results[i] = result
+        if pos_id in healthy:
+            result['error'] = healthy[pos_id]
+            continue
+        try:
+            debt = model.borrow_balance_stored(pos_id, token)
+        except Exception as e:
+            result['error'] = str(e)
+            continue
+        paid = debt if amount_call == MAX_UINT else amount_call
+        if paid > debt:
+            result['error'] = 'paid exceeds debt'
+            continue
+        pos = model.positions[pos_id]
+        groups[(token, pos.coll_token, pos.coll_id)].append((i, paid))
+    for (token, coll_token, coll_id), rows in groups.items():
+        try:
+            px_in, px_out, rate, liq = liquidation_terms(oracle, token, coll_token, coll_id)
+        except Exception as e:
+            for i, _ in rows:
+                results[i]['error'] = str(e)
+            continue
+        converted = [(paid * px_in // px_out * 2**112 // rate) * liq // (10000 * 10000) for _, paid in rows]
+        for (i, paid), amount in zip(rows, converted):
+            result = results[i]
+            bounty = min(amount, model.positions[result['position']].collateral_size)
+            result['paid'] = paid
+            result['bounty'] = bounty
+            result['cost'] = px_in * paid >> 112
+            result['value'] = px_out * (bounty * rate >> 112) >> 112
+            result['profit'] = result['value'] - result['cost']
+    return results
+
+
+def rank(results, min_profit=0):
+    '''Candidates that would succeed, most profitable first.'''
+    return sorted(
+        (result for result in results if result['error'] is None and result['profit'] > min_profit),
+        key=lambda result: -result['profit'],
+    )
@@ -0,0 +1,117 @@
+from collections import defaultdict
+
+from .bank_model import ZERO_ADDRESS
+from .health_engine import evaluate
+
+# Incremental liquidation scanner. Reverse indexes map each debt bank (its bit in Position.debtMap)
+# and each collateral underlying to the positions exposed to it, so a price update, factor change or
+# accrue only re-evaluates those positions instead of every id up to nextPositionId.
+
+
+class LiquidationScanner:
+    def __init__(self, model, oracle):
+        self.model = model  # bank_model.HomoraBankModel, updated in place
+        self.oracle = oracle  # health_engine.OracleSnapshot, updated in place
+        self.by_debt = defaultdict(set)  # bank index -> position ids with that debtMap bit set
+        self.by_collateral = defaultdict(set)  # underlying token -> position ids with that collateral
+        self.keys = {}  # position id -> (underlying, debtMap) it is indexed under
+        self.collateral = {}  # position id -> collateral ETH value
+        self.borrow = {}  # position id -> borrow ETH value
+        self.errors = {}  # position id -> revert message of the value calls
+        self.liquidatable = set()
+        for pos_id in model.positions:
+            self.index(pos_id)
+        self.refresh(model.positions)
+
+    def underlying(self, pos):
+        if pos.collateral_size == 0 or pos.coll_token == ZERO_ADDRESS:
+            return None
+        underlying = self.oracle.underlyings.get((pos.coll_token, pos.coll_id))
+        return underlying[0] if underlying else None
+
+    def index(self, pos_id):
+        '''(Re)index a position after its collateral or debt bits changed.'''
+        old_underlying, old_debt_map = self.keys.get(pos_id, (None, 0))
+        pos = self.model.positions[pos_id]
+        underlying = self.underlying(pos)
+        if underlying != old_underlying:
+            if old_underlying is not None:
+                self.by_collateral[old_underlying].discard(pos_id)
+            if underlying is not None:
+                self.by_collateral[underlying].add(pos_id)
+        changed = old_debt_map ^ pos.debt_map
+        idx = 0
+        while changed:
+            if changed & 1:
+                if pos.debt_map >> idx & 1:
+                    self.by_debt[idx].add(pos_id)
+                else:
+                    self.by_debt[idx].discard(pos_id)
+            idx += 1
+            changed >>= 1
+        self.keys[pos_id] = (underlying, pos.debt_map)
+
+    def exposed(self, token):
+        '''Ids of positions whose value depends on the price or factors of `token`.'''
+        ids = set(self.by_collateral.get(token, ()))
+        bank = self.model.banks.get(token)
+        if bank is not None:
+            ids |= self.by_debt.get(bank.index, set())
+        return ids
+
+    def refresh(self, ids):
+        '''Re-evaluate the given positions, return the ones that became liquidatable.'''
+        ids = list(ids)
+        if not ids:
+            return set()
+        health = evaluate(self.model, self.oracle, ids)
+        before = self.liquidatable & set(ids)
+        for pos_id, coll, borrow in zip(health.ids, health.collateral, health.borrow):
+            self.collateral[pos_id] = coll
+            self.borrow[pos_id] = borrow
+            self.errors.pop(pos_id, None)
+        self.errors.update(health.errors)
+        now = set(health.liquidatable())
+        self.liquidatable -= before - now
+        self.liquidatable |= now
+        return now - before
+
+    def on_prices(self, prices):
+        '''Apply new source prices (token -> px), return newly liquidatable positions.'''
+        ids = set()
+        for token, px in prices.items():
+            self.oracle.prices[token] = px
+            ids |= self.exposed(token)
+        return self.refresh(ids)
+
+    def on_token_factors(self, token_factors):
+        '''Apply ProxyOracle.setTokenFactors (token -> factors), return newly liquidatable positions.'''
+        ids = set()
+        for token, factors in token_factors.items():
+            self.oracle.token_factors[token] = tuple(factors)
+            ids |= self.exposed(token)
+        return self.refresh(ids)
+
+    def on_accrue(self, token, debt):
+        '''Apply HomoraBank.accrue given the bank's new cToken debt, return newly liquidatable positions.'''
+        self.model.accrue(token, debt)
+        return self.refresh(self.by_debt.get(self.model.banks[token].index, ()))
+
+    def on_positions(self, ids, exact=False):
+        '''Reindex and re-evaluate positions after execute or liquidate changed them in the model.
+        A borrow or repay also moves the debt of other positions in the same banks, by rounding only;
+        with exact=True those positions are re-evaluated too.'''
+        ids = set(ids)
+        debt_map = 0
+        for pos_id in ids:
+            debt_map |= self.keys.get(pos_id, (None, 0))[1]
+            self.index(pos_id)
+            debt_map |= self.model.positions[pos_id].debt_map
+        if exact:
+            idx = 0
+            while debt_map:
+                if debt_map & 1:
+                    ids |= self.by_debt.get(idx, set())
+                idx += 1
+                debt_map >>= 1
+        return self.refresh(ids)
@@ -0,0 +1,71 @@
+from .bank_model import add, sub
+from .uniswap_oracle_model import mul, sqrt
+
+# Off-chain optimalDeposit of UniswapV2SpellV1, SushiswapSpellV1 and IbETHRouterV2 (the three copies are
+# identical), followed by the swap and addLiquidity the spell performs with the result. plan() gives
+# the swap amount, the amounts the router deposits, the LP minted and amtAMin/amtBMin for a slippage
+# tolerance, without a call to the spell. The LP amount ignores the pair's protocol fee mint, which
+# is off on Uniswap V2 and takes a sliver of growth on Sushiswap.
+
+
+def optimal_deposit_a(amt_a, amt_b, res_a, res_b):
+    if mul(amt_a, res_b) < mul(amt_b, res_a):
+        raise Exception('Reversed')
+    a = 997
+    b = mul(1997, res_a)
+    c = mul(mul(sub(mul(amt_a, res_b), mul(amt_b, res_a)), 1000) // add(amt_b, res_b), res_a)
+    d = mul(mul(a, c), 4)
+    e = sqrt(add(mul(b, b), d))
+    return sub(e, b) // (a * 2)
+
+
+def optimal_deposit(amt_a, amt_b, res_a, res_b):
+    '''Return (swapAmt, isReversed): how much of A (B if reversed) the spell swaps before adding liquidity.'''
+    if mul(amt_a, res_b) >= mul(amt_b, res_a):
+        return optimal_deposit_a(amt_a, amt_b, res_a, res_b), False
+    return optimal_deposit_a(amt_b, amt_a, res_b, res_a), True
+
+
+def get_amount_out(amount_in, res_in, res_out):
+    '''UniswapV2Library.getAmountOut with the 0.3% fee.'''
+    amount_in_with_fee = amount_in * 997
+    return amount_in_with_fee * res_out // (res_in * 1000 + amount_in_with_fee)
+
+
+def quote(amount_a, res_a, res_b):
+    return amount_a * res_b // res_a
+
+
+def plan(amt_a, amt_b, res_a, res_b, total_supply, slippage_bps=0):
+    '''Swap and deposit the spell would do with balances (amt_a, amt_b) against a pair with reserves
+    (res_a, res_b) and `total_supply` LP tokens.'''
+    swap_amt, is_reversed = optimal_deposit(amt_a, amt_b, res_a, res_b)
+    if is_reversed:
+        out = get_amount_out(swap_amt, res_b, res_a)
+        amt_a, amt_b, res_a, res_b = amt_a + out, amt_b - swap_amt, res_a - out, res_b + swap_amt
+    else:
+        out = get_amount_out(swap_amt, res_a, res_b)
+        amt_a, amt_b, res_a, res_b = amt_a - swap_amt, amt_b + out, res_a + swap_amt, res_b - out
+    deposit_b = quote(amt_a, res_a, res_b)
+    if deposit_b <= amt_b:
+        deposit_a = amt_a
+    else:
+        deposit_a, deposit_b = quote(amt_b, res_b, res_a), amt_b
+    lp = min(deposit_a * total_supply // res_a, deposit_b * total_supply // res_b)
+    return {
+        'swap': swap_amt,
+        'reversed': is_reversed,
+        'amount_a': deposit_a,
+        'amount_b': deposit_b,
+        'lp': lp,
+        'amt_a_min': deposit_a * (10000 - slippage_bps) // 10000,
+        'amt_b_min': deposit_b * (10000 - slippage_bps) // 10000,
+    }
+
+
+def plans(amts_a, amts_b, reserves_a, reserves_b, total_supplies, slippage_bps=0):
+    '''plan() over parallel lists of candidate positions.'''
+    return [
+        plan(amt_a, amt_b, res_a, res_b, total_supply, slippage_bps)
+        for amt_a, amt_b, res_a, res_b, total_supply in zip(amts_a, amts_b, reserves_a, reserves_b, total_supplies)
+    ]
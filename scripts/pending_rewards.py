@@ -0,0 +1,119 @@
+from collections import defaultdict
+
+from .bank_model import ceil_div
+from .wrapper_ids import decode_wchef, decode_wgauge
+
+# Pending rewards of every position collateralized with a reward-bearing wrapper. The ERC1155 id of a
+# position holds the reward accumulator at mint time (WMasterChef: pid << 240 | sushiPerShare,
+# WLiquidityGauge: pid << 246 | gid << 240 | crvPerShare, WStakingRewards: the id is rewardPerToken).
+# Positions are grouped by pool, each pool's accumulator is read once, and the reward is what burn
+# would pay: accumulator * amount / scale minus the ceiled start value.
+
+WCHEF = 'wchef'
+WGAUGE = 'wgauge'
+WSTAKING = 'wstaking'
+SCALES = {WCHEF: 10**12, WGAUGE: 10**18, WSTAKING: 10**18}
+
+
+def decode(kind, id):
+    '''Return (pool, start accumulator) of an id of a wrapper of `kind`.'''
+    if kind == WCHEF:
+        return decode_wchef(id)
+    if kind == WGAUGE:
+        pid, gid, crv_per_share = decode_wgauge(id)
+        return (pid, gid), crv_per_share
+    if kind == WSTAKING:
+        return None, id
+    raise Exception(f'unknown wrapper kind {kind}')
+
+
+def pending(start, end, amount, scale):
+    '''Reward burn transfers for `amount` minted at accumulator `start`, burned at `end`.'''
+    st = ceil_div(start * amount, scale)
+    en = end * amount // scale
+    return en - st if en > st else 0
+
+
+def pools(model, wrappers):
+    '''Group positions by (wrapper, pool) for the wrappers given as address -> kind.
+    Return (wrapper, pool) -> [(position id, start accumulator)].'''
+    groups = defaultdict(list)
+    for pos_id, pos in model.positions.items():
+        kind = wrappers.get(pos.coll_token)
+        if kind is None or pos.collateral_size == 0:
+            continue
+        pool, start = decode(kind, pos.coll_id)
+        groups[(pos.coll_token, pool)].append((pos_id, start))
+    return groups
+
+
+def pending_rewards(model, wrappers, accumulators):
+    '''Pending reward of each position, given the current accumulator of each (wrapper, pool).'''
+    rewards = {}
+    for key, rows in pools(model, wrappers).items():
+        end = accumulators.get(key)
+        if end is None:
+            continue
+        scale = SCALES[wrappers[key[0]]]
+        for pos_id, start in rows:
+            rewards[pos_id] = pending(start, end, model.positions[pos_id].collateral_size, scale)
+    return rewards
+
+
+def masterchef_acc(chef, pid, interface, block_number):
+    '''accSushiPerShare of `pid` after MasterChef.updatePool at `block_number`.'''
+    lp_token, alloc_point, last_reward_block, acc = chef.poolInfo(pid)
+    if block_number <= last_reward_block:
+        return acc
+    lp_supply = interface.IERC20Ex(lp_token).balanceOf(chef)
+    if lp_supply == 0:
+        return acc
+    multiplier = chef.getMultiplier(last_reward_block, block_number)
+    reward = multiplier * chef.sushiPerBlock() * alloc_point // chef.totalAllocPoint()
+    return acc + reward * 10**12 // lp_supply
+
+
+def gauge_acc(wgauge, pid, gid, Contract):
+    '''accCrvPerShare of a gauge after WLiquidityGauge.mintCrv.'''
+    impl, acc = wgauge.gauges(pid, gid)
+    gauge = Contract.from_explorer(impl)
+    gain = gauge.claimable_tokens.call(wgauge)
+    supply = gauge.balanceOf(wgauge)
+    if gain > 0 and supply > 0:
+        acc += gain * 10**18 // supply
+    return acc
+
+
+def read_accumulators(keys, wrappers, interface, Contract, block_number):
+    '''Read the current accumulator of each (wrapper, pool), once per pool. `wrappers` maps each wrapper
+    address to its deployed contract (WMasterChef, WLiquidityGauge or WStakingRewards).'''
+    accumulators = {}
+    chefs = {}
+    for address, pool in keys:
+        wrapper = wrappers[address]
+        kind = kind_of(wrapper)
+        if kind == WCHEF:
+            if address not in chefs:
+                chefs[address] = Contract.from_explorer(wrapper.chef())
+            accumulators[(address, pool)] = masterchef_acc(chefs[address], pool, interface, block_number)
+        elif kind == WGAUGE:
+            accumulators[(address, pool)] = gauge_acc(wrapper, *pool, Contract)
+        else:
+            accumulators[(address, pool)] = interface.IStakingRewards(wrapper.staking()).rewardPerToken()
+    return accumulators
+
+
+def kind_of(wrapper):
+    '''Kind of a deployed wrapper contract, from its contract name.'''
+    return {
+        'WMasterChef': WCHEF,
+        'WLiquidityGauge': WGAUGE,
+        'WStakingRewards': WSTAKING,
+    }[wrapper._name]
+
+
+def from_chain(model, wrappers, interface, Contract, block_number):
+    '''Pending reward of every position using one of the deployed `wrappers` (address -> contract).'''
+    kinds = {address: kind_of(wrapper) for address, wrapper in wrappers.items()}
+    keys = list(pools(model, kinds))
+    return pending_rewards(model, kinds, read_accumulators(keys, wrappers, interface, Contract, block_number))
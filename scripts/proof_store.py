@@ -0,0 +1,137 @@
+import mmap
+import os
+import struct
+
+# Binary proof store for SafeBox claims. The file holds every level of the tree as fixed-width 32-byte
+# nodes, followed by an index of (user, totalAmount, leaf index) records sorted by user address.
+# A reader mmaps the file, binary-searches the index and picks the sibling of each level, so a
+# lookup touches O(log n) pages and nothing is parsed up front.
+#
+# Layout (integers big-endian):
+#   header  magic 'SBPS', version u32, leaves u64, levels u32
+#   nodes   levels, bottom (leaves) first; a level of k nodes is followed by one of (k + 1) // 2
+#   index   leaves x (user 20 bytes, totalAmount 32 bytes, leaf index u64)
+
+MAGIC = b'SBPS'
+VERSION = 1
+HEADER = struct.Struct('>4sIQI')
+RECORD = struct.Struct('>20s32sQ')
+
+
+def level_sizes(leaves):
+    sizes = [leaves]
+    while sizes[-1] > 1:
+        sizes.append((sizes[-1] + 1) // 2)
+    return sizes
+
+
+def write(path, users, amounts, levels):
+    '''Write the tree from safebox_merkle.build and its sorted user index to `path`. The file is
+    replaced atomically, so readers that still map the previous one keep a consistent view.'''
+    records = sorted(
+        (bytes.fromhex(user[2:]), amount.to_bytes(32, 'big'), index)
+        for index, (user, amount) in enumerate(zip(users, amounts))
+    )
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(users), len(levels)))
+        for nodes in levels:
+            f.write(nodes)
+        for record in records:
+            f.write(RECORD.pack(*record))
+    os.replace(tmp_path, path)
+
+
+class ProofStore:
+    def __init__(self, path):
+        self.file = open(path, 'rb')
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.leaves, levels = HEADER.unpack_from(self.data)
+        if magic != MAGIC or version != VERSION:
+            raise Exception(f'not a proof store (version {VERSION}): {path}')
+        self.sizes = level_sizes(self.leaves) if self.leaves else [0]
+        if len(self.sizes) != levels:
+            raise Exception(f'corrupt proof store: {path}')
+        self.offsets = []
+        offset = HEADER.size
+        for size in self.sizes:
+            self.offsets.append(offset)
+            offset += size * 32
+        self.index_offset = offset
+
+    def close(self):
+        self.data.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __len__(self):
+        return self.leaves
+
+    @property
+    def root(self):
+        if not self.leaves:
+            return b'\x00' * 32
+        return self.node(len(self.sizes) - 1, 0)
+
+    def node(self, level, index):
+        offset = self.offsets[level] + index * 32
+        return self.data[offset:offset + 32]
+
+    def level(self, level):
+        offset = self.offsets[level]
+        return self.data[offset:offset + self.sizes[level] * 32]
+
+    def entries(self):
+        '''Return (users, amounts) in leaf order.'''
+        users = [None] * self.leaves
+        amounts = [None] * self.leaves
+        for position in range(self.leaves):
+            user, amount, index = self.record(position)
+            users[index] = user
+            amounts[index] = amount
+        return users, amounts
+
+    def record(self, position):
+        '''(user, totalAmount, leaf index) of the position-th user in address order.'''
+        user, amount, index = RECORD.unpack_from(self.data, self.index_offset + position * RECORD.size)
+        return '0x' + user.hex(), int.from_bytes(amount, 'big'), index
+
+    def find(self, user):
+        '''Position of `user` in the index, or None.'''
+        key = bytes.fromhex(user[2:].lower())
+        lo, hi = 0, self.leaves
+        while lo < hi:
+            mid = (lo + hi) // 2
+            offset = self.index_offset + mid * RECORD.size
+            if self.data[offset:offset + 20] < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self.leaves:
+            offset = self.index_offset + lo * RECORD.size
+            if self.data[offset:offset + 20] == key:
+                return lo
+        return None
+
+    def proof(self, index):
+        '''Sibling hashes of the leaf at `index`, from the leaf level up.'''
+        siblings = []
+        for level, size in enumerate(self.sizes[:-1]):
+            sibling = index ^ 1
+            if sibling < size:
+                siblings.append(self.node(level, sibling))
+            index >>= 1
+        return siblings
+
+    def claim(self, user):
+        '''(totalAmount, proof) to pass to SafeBox.claim for `user`, or None if it has no leaf.'''
+        position = self.find(user)
+        if position is None:
+            return None
+        _, amount, index = self.record(position)
+        return amount, self.proof(index)
@@ -0,0 +1,101 @@
+import multiprocessing
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from .proof_store import ProofStore
+from .safebox_merkle import hash_pair, leaf
+
+# Checks every claim of a proof store before its root goes to SafeBox.updateRoot. Each user's leaf is
+# rebuilt from the index (abi.encodePacked(user, totalAmount)) and folded with its proof the way
+# OpenZeppelin MerkleProof.verify does, so a wrong amount, a misplaced leaf or a stale node all
+# fail. The root to check against is the one about to be set on chain, not the store's own root,
+# which the store always agrees with. The index is split into shards checked by a process pool;
+# each worker maps the store itself, and the first failing shard stops the run with the failing
+# claim: pending shards are cancelled and running ones stop at their next STOP_CHECK users.
+
+STOP_CHECK = 1024  # users a worker checks between looks at the stop flag
+
+_store = None  # ProofStore of a worker process
+_stop = None  # multiprocessing.Event set by the parent once a shard has failed
+
+
+def verify(proof, root, leaf):
+    '''MerkleProof.verify (OpenZeppelin 3.4).'''
+    computed = leaf
+    for node in proof:
+        computed = hash_pair(computed, node)
+    return computed == root
+
+
+def check(store, root, start, end, stop=None):
+    '''Check the users at index positions [start, end). Return None, or a description of the first
+    failing claim. Return None early once `stop` is set.'''
+    for position in range(start, end):
+        if stop is not None and (position - start) % STOP_CHECK == 0 and stop.is_set():
+            return None
+        user, amount, index = store.record(position)
+        proof = store.proof(index)
+        if not verify(proof, root, leaf(user, amount)):
+            return {
+                'user': user,
+                'totalAmount': amount,
+                'leaf index': index,
+                'leaf': '0x' + leaf(user, amount).hex(),
+                'stored leaf': '0x' + store.node(0, index).hex(),
+                'proof': ['0x' + node.hex() for node in proof],
+            }
+    return None
+
+
+def _init_worker(path, stop):
+    global _store, _stop
+    _store = ProofStore(path)
+    _stop = stop
+
+
+def _check_in_worker(args):
+    return check(_store, *args, stop=_stop)
+
+
+def shards(n, count):
+    size = -(-n // count) if n else 1
+    return [(start, min(start + size, n)) for start in range(0, n, size)]
+
+
+def verify_store(path, root, processes=None, shard_count=None, log=print):
+    '''Check every claim of the store at `path` against the expected `root`. Raise on the first
+    failure.'''
+    if not root:
+        raise Exception('an expected root is required')
+    processes = processes or os.cpu_count() or 1
+    with ProofStore(path) as store:
+        n = len(store)
+        if processes == 1:
+            failure = check(store, root, 0, n)
+            if failure is not None:
+                raise Exception(f'bad proof: {failure}')
+            log(f'{n} proofs ok')
+            return n
+    parts = shards(n, shard_count or processes * 8)
+    done = 0
+    stop = multiprocessing.Event()
+    with ProcessPoolExecutor(processes, initializer=_init_worker, initargs=(str(path), stop)) as executor:
+        futures = {executor.submit(_check_in_worker, (root, *part)): i for i, part in enumerate(parts)}
+        pending = set(futures)
+        while pending:
+            finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                i = futures[future]
+                failure = future.result()
+                if failure is not None:
+                    stop.set()
+                    for other in pending:
+                        other.cancel()
+                    raise Exception(f'bad proof in shard {i + 1}/{len(parts)} {parts[i]}: {failure}')
+                done += parts[i][1] - parts[i][0]
+                log(f'shard {i + 1}/{len(parts)} ok, {done}/{n} proofs')
+    return n
+
+
+def main(path, root):
+    verify_store(path, bytes.fromhex(root[2:]))
@@ -0,0 +1,210 @@
+import json
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from eth_utils import keccak
+
+from . import proof_store
+
+# Merkle distribution for SafeBox.updateRoot/claim. Records are 'user,totalAmount' lines, read in
+# chunks; a process pool hashes the leaves keccak256(abi.encodePacked(user, totalAmount)) and then
+# each level of the tree, with a bounded number of chunks in flight. That bounds the work queued on
+# the pool, not memory: the users, the amounts and every level of the tree stay in memory until they
+# are written to the proof store. Each user appears once. Pairs are hashed sorted, as
+# OpenZeppelin MerkleProof.verify expects, and the last node of an odd level moves up unhashed.
+# Leaves keep the order of the records file, so a user keeps its leaf index across epochs as long
+# as the relayer only appends new users. Nodes are kept as flat bytes, 32 per node.
+# Between epochs, update() starts from the levels persisted in the previous proof store and only
+# rehashes the paths above changed or appended leaves.
+
+CHUNK_SIZE = 65536  # records, or nodes for the levels, per pool task; must be even
+
+
+def leaf(user, total_amount):
+    return keccak(bytes.fromhex(user[2:]) + total_amount.to_bytes(32, 'big'))
+
+
+def hash_pair(a, b):
+    return keccak(a + b) if a <= b else keccak(b + a)
+
+
+def hash_leaves(records):
+    return b''.join(leaf(user, amount) for user, amount in records)
+
+
+def hash_level(nodes):
+    '''Parent level of `nodes` (flat 32-byte nodes).'''
+    parents = [hash_pair(nodes[i:i + 32], nodes[i + 32:i + 64]) for i in range(0, len(nodes) - 32, 64)]
+    if len(nodes) // 32 % 2:
+        parents.append(nodes[-32:])
+    return b''.join(parents)
+
+
+def read_records(path):
+    '''Yield (user, totalAmount) from a 'user,totalAmount' file, skipping blank lines.'''
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                user, amount = line.split(',')
+                yield user.lower(), int(amount)
+
+
+def chunks(iterable, size):
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def pool_map(executor, fn, tasks, window):
+    '''executor.map, but with at most `window` tasks submitted ahead of the consumer.'''
+    if executor is None:
+        yield from map(fn, tasks)
+        return
+    pending = deque()
+    for task in tasks:
+        pending.append(executor.submit(fn, task))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def build_levels(leaves, executor=None, window=1):
+    '''All levels from the leaves up to the root, as flat bytes.'''
+    levels = [leaves]
+    while len(levels[-1]) > 32:
+        nodes = levels[-1]
+        step = CHUNK_SIZE * 32
+        parts = (nodes[i:i + step] for i in range(0, len(nodes), step))
+        levels.append(b''.join(pool_map(executor, hash_level, parts, window)))
+    return levels
+
+
+def root(levels):
+    return levels[-1] if levels[-1] else b'\x00' * 32
+
+
+def proof(levels, index):
+    '''Sibling hashes from the leaf at `index` up to the root.'''
+    siblings = []
+    for nodes in levels[:-1]:
+        sibling = index ^ 1
+        if sibling * 32 < len(nodes):
+            siblings.append(nodes[sibling * 32:sibling * 32 + 32])
+        index >>= 1
+    return siblings
+
+
+def update(levels, leaves):
+    '''Set leaves (index -> leaf hash) and rehash the paths above them, in place. Indexes past the
+    last leaf must extend the leaf level without gaps. `levels` is a list of bytearrays.'''
+    nodes = levels[0]
+    size = len(nodes) // 32
+    for index in sorted(leaves):
+        if index < size:
+            nodes[index * 32:index * 32 + 32] = leaves[index]
+        elif index == size:
+            nodes += leaves[index]
+            size += 1
+        else:
+            raise Exception(f'leaf {index} leaves a gap after leaf {size - 1}')
+    dirty = set(leaves)
+    level = 0
+    while len(levels[level]) > 32:
+        nodes = levels[level]
+        size = len(nodes) // 32
+        if level + 1 == len(levels):
+            levels.append(bytearray())
+        parents = levels[level + 1]
+        parents += bytes((size + 1) // 2 * 32 - len(parents))
+        dirty = {index >> 1 for index in dirty}
+        for index in dirty:
+            left = nodes[index * 64:index * 64 + 32]
+            if index * 2 + 1 < size:
+                parents[index * 32:index * 32 + 32] = hash_pair(left, nodes[index * 64 + 32:index * 64 + 64])
+            else:
+                parents[index * 32:index * 32 + 32] = left
+        level += 1
+    del levels[level + 1:]
+    return levels
+
+
+def rebuild(store_path, changes):
+    '''Apply (user, totalAmount) changes to the tree of a proof store. Return (users, amounts, levels).'''
+    with proof_store.ProofStore(store_path) as store:
+        levels = [bytearray(store.level(level)) for level in range(len(store.sizes))]
+        users, amounts = store.entries()
+        leaves = {}
+        appended = {}
+        for user, amount in changes:
+            position = store.find(user)
+            if position is not None:
+                index = store.record(position)[2]
+            else:
+                index = appended.setdefault(user, len(users))
+                if index == len(users):
+                    users.append(user)
+                    amounts.append(amount)
+            amounts[index] = amount
+            leaves[index] = leaf(user, amount)
+    return users, amounts, update(levels, leaves)
+
+
+def build(records, processes=None):
+    '''Return (users, amounts, levels) for an iterable of (user, totalAmount). A user may only
+    appear once, as two leaves would give it two conflicting claims.'''
+    processes = processes or os.cpu_count() or 1
+    users = []
+    amounts = []
+    seen = set()
+
+    def tee(records):
+        for user, amount in records:
+            if user in seen:
+                raise Exception(f'duplicate user {user}')
+            seen.add(user)
+            users.append(user)
+            amounts.append(amount)
+            yield user, amount
+
+    if processes == 1:
+        leaves = b''.join(map(hash_leaves, chunks(tee(records), CHUNK_SIZE)))
+        return users, amounts, build_levels(leaves)
+    with ProcessPoolExecutor(processes) as executor:
+        window = processes * 2
+        leaves = b''.join(pool_map(executor, hash_leaves, chunks(tee(records), CHUNK_SIZE), window))
+        return users, amounts, build_levels(leaves, executor, window)
+
+
+def write_proofs(path, users, amounts, levels):
+    '''One JSON line per user with its totalAmount and proof, the arguments of SafeBox.claim.
+    For small distributions; the proof store is much smaller and faster to load.'''
+    with open(path, 'w') as f:
+        for index, (user, amount) in enumerate(zip(users, amounts)):
+            f.write(json.dumps({
+                'user': user,
+                'totalAmount': str(amount),
+                'proof': ['0x' + node.hex() for node in proof(levels, index)],
+            }) + '\n')
+
+
+def main(records_path, store_path='safebox-proofs.bin'):
+    users, amounts, levels = build(read_records(records_path))
+    proof_store.write(store_path, users, amounts, levels)
+    print(f'{len(users)} users, root 0x{root(levels).hex()}')
+    return root(levels)
+
+
+def main_update(changes_path, store_path='safebox-proofs.bin'):
+    '''Apply a 'user,totalAmount' file of changed and new users to the proof store in place.'''
+    users, amounts, levels = rebuild(store_path, read_records(changes_path))
+    proof_store.write(store_path, users, amounts, levels)
+    print(f'{len(users)} users, root 0x{root(levels).hex()}')
+    return root(levels)
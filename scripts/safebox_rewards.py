@@ -0,0 +1,164 @@
+import json
+import os
+from pathlib import Path
+
+from .safebox_merkle import read_records
+
+# Reward accrual for SafeBox / SafeBoxETH holders, feeding the Merkle records. Rewards follow a
+# schedule of reward-per-second rates and are split pro rata to ibToken balances, with the same
+# reward-per-token accumulator as StakingRewards: an event only touches the sender and the
+# receiver, so the whole Transfer history (mints from and burns to the zero address included) is
+# processed in one pass. The state is saved between runs, so each epoch only reads the events since
+# the last one. Holders are kept in first-seen order, which keeps their Merkle leaf index stable.
+
+ZERO_ADDRESS = '0x0000000000000000000000000000000000000000'
+TRANSFER_TOPIC = '0xddf252ad1be2c89b69c2b068fc378daa952ba7f163c4a11628f55a4df523b3ef'
+PRECISION = 10**18
+STATE_PATH = Path('safebox-rewards.json')
+
+
+class Holder:
+    __slots__ = ('balance', 'paid', 'earned', 'updated', 'weighted')
+
+    def __init__(self, balance=0, paid=0, earned=0, updated=0, weighted=0):
+        self.balance = balance
+        self.paid = paid  # rewardPerToken when earned was last settled
+        self.earned = earned  # cumulative reward, the totalAmount of the Merkle leaf
+        self.updated = updated  # time weighted was last advanced to
+        self.weighted = weighted  # balance x seconds in the current epoch
+
+
+class RewardAccrual:
+    def __init__(self, schedule, start):
+        self.schedule = sorted(schedule)  # [(from time, reward per second)]
+        self.time = start
+        self.epoch_start = start
+        self.total_supply = 0
+        self.reward_per_token = 0
+        self.holders = {}
+
+    def rewards_between(self, start, end):
+        '''Reward emitted by the schedule over [start, end).'''
+        total = 0
+        for i, (since, rate) in enumerate(self.schedule):
+            until = self.schedule[i + 1][0] if i + 1 < len(self.schedule) else end
+            lo = max(start, since)
+            hi = min(end, until)
+            if hi > lo:
+                total += (hi - lo) * rate
+        return total
+
+    def advance(self, time):
+        if time < self.time:
+            raise Exception(f'event at {time} before {self.time}')
+        if self.total_supply and time > self.time:
+            self.reward_per_token += self.rewards_between(self.time, time) * PRECISION // self.total_supply
+        self.time = time
+
+    def settle(self, user):
+        holder = self.holders.get(user)
+        if holder is None:
+            holder = self.holders[user] = Holder(paid=self.reward_per_token, updated=self.time)
+        holder.earned += holder.balance * (self.reward_per_token - holder.paid) // PRECISION
+        holder.paid = self.reward_per_token
+        holder.weighted += holder.balance * (self.time - holder.updated)
+        holder.updated = self.time
+        return holder
+
+    def transfer(self, time, sender, receiver, value):
+        self.advance(time)
+        if sender == ZERO_ADDRESS:
+            self.total_supply += value
+        else:
+            holder = self.settle(sender)
+            if holder.balance < value:
+                raise Exception(f'{sender} transfers {value} with a balance of {holder.balance}')
+            holder.balance -= value
+        if receiver == ZERO_ADDRESS:
+            self.total_supply -= value
+        else:
+            self.settle(receiver).balance += value
+
+    def process(self, events):
+        '''Apply (time, from, to, value) Transfer events in order.'''
+        for time, sender, receiver, value in events:
+            self.transfer(time, sender.lower(), receiver.lower(), value)
+
+    def close_epoch(self, end):
+        '''Accrue every holder up to `end`. Return user -> time-weighted balance over the epoch.'''
+        self.advance(end)
+        length = end - self.epoch_start
+        balances = {}
+        for user in self.holders:
+            holder = self.settle(user)
+            balances[user] = holder.weighted // length if length else holder.balance
+            holder.weighted = 0
+        self.epoch_start = end
+        return balances
+
+    def totals(self):
+        '''user -> cumulative reward, as of the last settlement of each holder.'''
+        return {user: holder.earned for user, holder in self.holders.items()}
+
+    def save(self, path=STATE_PATH):
+        state = {
+            'schedule': self.schedule,
+            'time': self.time,
+            'epoch_start': self.epoch_start,
+            'total_supply': str(self.total_supply),
+            'reward_per_token': str(self.reward_per_token),
+            'holders': {
+                user: [str(getattr(holder, field)) for field in Holder.__slots__]
+                for user, holder in self.holders.items()
+            },
+        }
+        tmp_path = Path(f'{path}.{os.getpid()}.tmp')
+        tmp_path.write_text(json.dumps(state))
+        tmp_path.replace(path)
+
+    @classmethod
+    def load(cls, path=STATE_PATH):
+        state = json.loads(Path(path).read_text())
+        accrual = cls([tuple(piece) for piece in state['schedule']], state['epoch_start'])
+        accrual.time = state['time']
+        accrual.total_supply = int(state['total_supply'])
+        accrual.reward_per_token = int(state['reward_per_token'])
+        accrual.holders = {
+            user: Holder(*map(int, fields)) for user, fields in state['holders'].items()
+        }
+        return accrual
+
+
+def write_records(path, totals, previous=None):
+    '''Write 'user,totalAmount' records for safebox_merkle. Users of the `previous` records file come
+    first in the same order, so their leaf index does not move.'''
+    order = [user for user, _ in read_records(previous)] if previous else []
+    seen = set(order)
+    order += [user for user in totals if user not in seen]
+    with open(path, 'w') as f:
+        for user in order:
+            f.write(f'{user},{totals.get(user, 0)}\n')
+
+
+def read_transfers(web3, safebox, from_block, to_block, step=10000):
+    '''Yield (timestamp, from, to, value) of the Transfer events of `safebox`, one log query per `step`
+    blocks.'''
+    timestamps = {}
+    for start in range(from_block, to_block + 1, step):
+        logs = web3.eth.get_logs({
+            'address': str(safebox),
+            'fromBlock': start,
+            'toBlock': min(start + step - 1, to_block),
+            'topics': [TRANSFER_TOPIC],
+        })
+        for log in logs:
+            block = log['blockNumber']
+            if block not in timestamps:
+                timestamps.clear()
+                timestamps[block] = web3.eth.get_block(block)['timestamp']
+            yield (
+                timestamps[block],
+                '0x' + bytes(log['topics'][1])[-20:].hex(),
+                '0x' + bytes(log['topics'][2])[-20:].hex(),
+                int.from_bytes(bytes.fromhex(log['data'][2:]) if isinstance(log['data'], str) else log['data'], 'big'),
+            )
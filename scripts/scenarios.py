@@ -0,0 +1,222 @@
+import json
+from pathlib import Path
+
+from brownie import chain, interface
+from brownie.exceptions import VirtualMachineError
+from .fork_world import *
+
+# Table-driven replacement for the per-spell fork scripts (uniswap_spell_add_remove_test.py,
+# sushiswap_spell_wmasterchef_add_twice_test.py, curve_spell_wgauge_3_harvest_test.py, ...).
+# Each case is spell x wrapper x token set x action sequence. The world is deployed once, and
+# every case runs from the same chain snapshot.
+#   brownie run scenarios --network mainnet-fork
+#   brownie run scenarios main curve --network mainnet-fork  # only cases whose name contains 'curve'
+
+RESULTS_PATH = Path('scenario-results.jsonl')
+HARVEST_DELAY = 86400
+
+SEQUENCES = {
+    'add-remove': ['add', 'remove_half', 'remove_all'],
+    'add-twice': ['add', 'add_again', 'remove_all'],
+    'harvest': ['add', 'harvest', 'remove_all'],
+}
+
+# wrapper key in the deployed world -> kind of wrapper
+WRAPPERS = {
+    'werc20': 'werc20',
+    'wchef': 'wchef',
+    'wstaking': 'wstaking',
+    'bal_wstaking': 'wstaking',
+    'wgauge': 'wgauge',
+}
+
+
+def cases(name, spell, wrapper, lp, supply, borrow, sequences, pid=0):
+    '''Expand one spell x wrapper x token set into a case per action sequence.
+    supply and borrow map token -> amount in whole tokens.'''
+    return [{
+        'name': f'{name}-{sequence}',
+        'spell': spell,
+        'wrapper': wrapper,
+        'lp': lp,
+        'supply': supply,
+        'borrow': borrow,
+        'actions': SEQUENCES[sequence],
+        'pid': pid,
+    } for sequence in sequences]
+
+
+CASES = [
+    *cases('uniswap-werc20-usdt-weth', 'uniswap', 'werc20', UNI_USDT_WETH,
+           {USDT: 400, WETH: 1}, {USDT: 1000}, ['add-remove', 'add-twice']),
+    *cases('uniswap-werc20-usdc-usdt', 'uniswap', 'werc20', UNI_USDC_USDT,
+           {USDC: 1000, USDT: 1000}, {USDC: 500, USDT: 500}, ['add-remove', 'add-twice']),
+    *cases('uniswap-wstaking-dpi-weth', 'uniswap', 'wstaking', UNI_DPI_WETH,
+           {DPI: 10, WETH: 1}, {DPI: 1}, ['add-remove', 'add-twice', 'harvest']),
+    *cases('sushiswap-werc20-usdt-weth', 'sushiswap', 'werc20', SUSHI_USDT_WETH,
+           {USDT: 400, WETH: 1}, {USDT: 1000}, ['add-remove', 'add-twice']),
+    *cases('sushiswap-wchef-usdt-weth', 'sushiswap', 'wchef', SUSHI_USDT_WETH,
+           {USDT: 400, WETH: 1}, {USDT: 1000}, ['add-remove', 'add-twice', 'harvest'], pid=0),
+    *cases('balancer-werc20-dai-weth', 'balancer', 'werc20', BAL_DAI_WETH,
+           {DAI: 1000, WETH: 1}, {DAI: 500}, ['add-remove', 'add-twice']),
+    *cases('balancer-wstaking-dfd-dusd', 'balancer', 'bal_wstaking', BAL_DFD_DUSD,
+           {DFD: 1000, DUSD: 500}, {DFD: 100}, ['add-remove', 'add-twice', 'harvest']),
+    *cases('curve-wgauge-2-renbtc-wbtc', 'curve', 'wgauge', CRV_REN_WBTC,
+           {RENBTC: 0.1, WBTC: 0.1}, {WBTC: 0.01}, ['add-remove', 'add-twice', 'harvest'], pid=9),
+    *cases('curve-wgauge-3-3pool', 'curve', 'wgauge', CRV_3POOL,
+           {DAI: 200, USDC: 500, USDT: 400}, {DAI: 10, USDC: 20, USDT: 10},
+           ['add-remove', 'add-twice', 'harvest'], pid=0),
+    *cases('curve-wgauge-4-susd', 'curve', 'wgauge', CRV_SUSD,
+           {DAI: 200, USDC: 1000, USDT: 1000, SUSD: 1000}, {USDC: 100},
+           ['add-remove', 'add-twice', 'harvest'], pid=12),
+]
+
+
+def pool_tokens(case):
+    '''Underlying tokens of the case's LP, in the order the spell expects its amounts.'''
+    lp = case['lp']
+    if case['spell'] in ('uniswap', 'sushiswap'):
+        pair = interface.IUniswapV2Pair(lp)
+        return [pair.token0(), pair.token1()]
+    if case['spell'] == 'balancer':
+        return list(interface.IBalancerPool(lp).getFinalTokens())
+    registry = interface.ICurveRegistry(CRV_REGISTRY)
+    coins = registry.get_coins(registry.get_pool_from_lp_token(lp))
+    return [coin for coin in coins if coin != '0x0000000000000000000000000000000000000000']
+
+
+def scale(amounts, tokens):
+    amounts = {token.lower(): amount for token, amount in amounts.items()}
+    return [int(amounts.get(token.lower(), 0) * 10**interface.IERC20Ex(token).decimals()) for token in tokens]
+
+
+def encode(env, case, tokens, action, pos_id):
+    '''Return calldata for one action of `case` on position `pos_id`.'''
+    spell = env[f'{case["spell"]}_spell']
+    kind = WRAPPERS[case['wrapper']]
+    wrapper = env[case['wrapper']]
+    lp = case['lp']
+    n = len(tokens)
+
+    if action in ('add', 'add_again'):
+        supply = scale(case['supply'], tokens)
+        borrow = scale(case['borrow'], tokens)
+        if case['spell'] == 'curve':
+            return getattr(spell, f'addLiquidity{n}').encode_input(
+                lp, supply, 0, borrow, 0, 0, case['pid'], 0)
+        if case['spell'] == 'balancer':
+            amts = supply + [0] + borrow + [0, 0]
+            fn, args = {
+                'werc20': (spell.addLiquidityWERC20, [lp, amts]),
+                'wstaking': (spell.addLiquidityWStakingRewards, [lp, amts, wrapper]),
+            }[kind]
+            return fn.encode_input(*args)
+        amts = supply + [0] + borrow + [0, 0, 0]
+        fn, args = {
+            'werc20': (spell.addLiquidityWERC20, [amts]),
+            'wstaking': (spell.addLiquidityWStakingRewards, [amts, wrapper]),
+            'wchef': (spell.addLiquidityWMasterChef, [amts, case['pid']]),
+        }[kind]
+        return fn.encode_input(tokens[0], tokens[1], *args)
+
+    if action in ('remove_half', 'remove_all'):
+        homora = env['homora']
+        if action == 'remove_all':
+            take = 2**256-1
+            repay = [2**256-1 if amt else 0 for amt in scale(case['borrow'], tokens)]
+        else:
+            take = homora.getPositionInfo(pos_id)[3] // 2
+            repay = [homora.borrowBalanceStored(pos_id, token) // 2 for token in tokens]
+        if case['spell'] == 'curve':
+            return getattr(spell, f'removeLiquidity{n}').encode_input(lp, take, 0, repay, 0, [0] * n)
+        amts = [take, 0] + repay + [0, 0, 0]
+        if case['spell'] == 'balancer':
+            fn, args = {
+                'werc20': (spell.removeLiquidityWERC20, [lp, amts]),
+                'wstaking': (spell.removeLiquidityWStakingRewards, [lp, amts, wrapper]),
+            }[kind]
+            return fn.encode_input(*args)
+        fn, args = {
+            'werc20': (spell.removeLiquidityWERC20, [amts]),
+            'wstaking': (spell.removeLiquidityWStakingRewards, [amts, wrapper]),
+            'wchef': (spell.removeLiquidityWMasterChef, [amts]),
+        }[kind]
+        return fn.encode_input(tokens[0], tokens[1], *args)
+
+    if action == 'harvest':
+        if kind == 'wgauge':
+            return spell.harvest.encode_input()
+        if kind == 'wchef':
+            return spell.harvestWMasterChef.encode_input()
+        if kind == 'wstaking':
+            return spell.harvestWStakingRewards.encode_input(wrapper)
+        raise Exception(f'no harvest for {case["wrapper"]}')
+
+    raise Exception(f'unknown action {action}')
+
+
+def run_case(env, case):
+    '''Run the actions of `case` in order and return one result record per action.'''
+    homora = env['homora']
+    alice = env['alice']
+    spell = env[f'{case["spell"]}_spell']
+    tokens = pool_tokens(case)
+    watched = [interface.IERC20Ex(token) for token in tokens + [case['lp']]]
+    pos_id = 0
+    results = []
+
+    for step, action in enumerate(case['actions']):
+        result = {'case': case['name'], 'step': step, 'action': action}
+        results.append(result)
+        prev = [token.balanceOf(alice) for token in watched]
+        try:
+            if action == 'harvest':
+                chain.sleep(HARVEST_DELAY)
+                chain.mine()
+            tx = homora.execute(pos_id, spell, encode(env, case, tokens, action, pos_id), {'from': alice})
+            if pos_id == 0:
+                pos_id = homora.nextPositionId() - 1
+
+            # same invariants as the per-spell scripts: nothing is left in the spell
+            for token in watched:
+                assert token.balanceOf(spell) == 0, f'non-zero spell {token.symbol()} balance'
+            _, _, _, coll_size = homora.getPositionInfo(pos_id)
+            debt_tokens, debts = homora.getPositionDebts(pos_id)
+            if action == 'remove_all':
+                assert coll_size == 0, 'collateral left after removing all'
+                assert not any(debts), 'debt left after removing all'
+        except (VirtualMachineError, AssertionError) as e:
+            result.update({'status': 'failed', 'error': str(e)})
+            print(f'{case["name"]:<45} {action:<12} FAILED: {e}')
+            break
+
+        result.update({
+            'status': 'ok',
+            'gas': tx.gas_used,
+            'position': pos_id,
+            'collateral': coll_size,
+            'debts': {str(token): debt for token, debt in zip(debt_tokens, debts)},
+            'deltas': {
+                token.address: token.balanceOf(alice) - before for token, before in zip(watched, prev)
+            },
+        })
+        print(f'{case["name"]:<45} {action:<12} gas {tx.gas_used:>9}')
+    return results
+
+
+def main(pattern=''):
+    env = deploy()
+    chain.snapshot()
+    selected = [case for case in CASES if pattern in case['name']]
+    failed = []
+    with RESULTS_PATH.open('w') as f:
+        for case in selected:
+            chain.revert()
+            results = run_case(env, case)
+            for result in results:
+                f.write(json.dumps(result) + '\n')
+            if results[-1]['status'] != 'ok':
+                failed.append(case['name'])
+    print('=========================================================================')
+    print(f'{len(selected) - len(failed)}/{len(selected)} cases passed, results written to {RESULTS_PATH}')
+    assert not failed, f'failed cases: {", ".join(failed)}'
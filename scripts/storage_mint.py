@@ -0,0 +1,121 @@
+import json
+import os
+from pathlib import Path
+
+# Fast path for mint_tokens: overwrite the holder's ERC20 balance slot through the node's
+# setStorageAt, a single RPC call with no mined transaction. The balance mapping slot of each
+# token is found once by probing and cached on disk. totalSupply is not updated, so tokens whose
+# supply matters to the test (LP tokens) should keep minting through transactions.
+# Set STORAGE_MINT=0 to always mint through transactions. brownie's web3 is imported where it is
+# used, so that importing this module works wherever utils_fork can be imported.
+
+SLOTS_PATH = Path(__file__).parent.parent / '.chain-cache' / 'balance-slots.json'
+ENABLED = os.environ.get('STORAGE_MINT', '1') != '0'
+MAX_PROBE_SLOT = 32  # Balance mappings are declared early, so probing stops after this slot.
+PROBE_HOLDER = '0x00000000000000000000000000000000c0ffee01'
+PROBE_VALUE = 0xc0ffee << 64
+SET_STORAGE_METHODS = ['hardhat_setStorageAt', 'evm_setAccountStorageAt']  # anvil/hardhat, ganache 7
+LP_SYMBOLS = {'UNI-V2', 'SLP', 'BPT'}  # Uniswap, Sushiswap and Balancer LP tokens; Curve ones go by name
+
+_slots = None  # Mapping from token address to [layout, slot], or None if no plain slot exists.
+_set_storage_method = None  # First method in SET_STORAGE_METHODS the node accepted, False if none.
+
+
+def load_slots():
+    global _slots
+    if _slots is None:
+        _slots = json.loads(SLOTS_PATH.read_text()) if SLOTS_PATH.exists() else {}
+    return _slots
+
+
+def save_slots():
+    SLOTS_PATH.parent.mkdir(exist_ok=True)
+    tmp_path = SLOTS_PATH.with_suffix(f'.{os.getpid()}.tmp')
+    tmp_path.write_text(json.dumps(_slots, indent=2, sort_keys=True))
+    tmp_path.replace(SLOTS_PATH)
+
+
+def balance_key(layout, slot, holder):
+    '''Return the storage key of balances[holder] for a mapping declared at `slot`.'''
+    from brownie import web3
+    holder = bytes.fromhex(str(holder)[2:]).rjust(32, b'\0')
+    slot = slot.to_bytes(32, 'big')
+    if layout == 'solidity':
+        return int.from_bytes(web3.keccak(holder + slot), 'big')
+    return int.from_bytes(web3.keccak(slot + holder), 'big')  # vyper
+
+
+def get_storage(address, key):
+    from brownie import web3
+    response = web3.provider.make_request('eth_getStorageAt', [address, hex(key), 'latest'])
+    return int(response['result'], 16)
+
+
+def set_storage(address, key, value):
+    '''Write one storage word, return False if the node has no setStorageAt method.'''
+    from brownie import web3
+    global _set_storage_method
+    if _set_storage_method is False:
+        return False
+    value = '0x' + value.to_bytes(32, 'big').hex()
+    for method in [_set_storage_method] if _set_storage_method else SET_STORAGE_METHODS:
+        if method == 'hardhat_setStorageAt':
+            params = [address, hex(key), value]
+        else:
+            params = [address, '0x' + key.to_bytes(32, 'big').hex(), value]
+        if 'error' not in web3.provider.make_request(method, params):
+            _set_storage_method = method
+            return True
+    _set_storage_method = False
+    return False
+
+
+def find_slot(token):
+    '''Probe for the balance mapping of `token`, return [layout, slot] or None.'''
+    for slot in range(MAX_PROBE_SLOT):
+        for layout in ('solidity', 'vyper'):
+            key = balance_key(layout, slot, PROBE_HOLDER)
+            original = get_storage(token.address, key)
+            set_storage(token.address, key, PROBE_VALUE)
+            try:
+                found = token.balanceOf(PROBE_HOLDER) == PROBE_VALUE
+            finally:
+                set_storage(token.address, key, original)
+            if found:
+                return [layout, slot]
+    return None
+
+
+def mint_via_storage(token, to, amount):
+    '''Add `amount` to the balance of `to` by writing storage, return whether it succeeded.'''
+    if not ENABLED or _set_storage_method is False:
+        return False
+    slots = load_slots()
+    address = token.address.lower()
+    if address not in slots:
+        # check the node supports setStorageAt before probing
+        if not set_storage(token.address, 0, get_storage(token.address, 0)):
+            return False
+        slots[address] = find_slot(token)
+        save_slots()
+    if slots[address] is None:
+        return False
+    key = balance_key(*slots[address], to)
+    balance = get_storage(token.address, key)
+    return set_storage(token.address, key, balance + amount)
+
+
+def is_lp(token):
+    '''Return whether `token` is an LP token, which mint_tokens mints through its pool.'''
+    return token.symbol() in LP_SYMBOLS or token.name()[:8] == 'Curve.fi'
+
+
+def mint_fast(token, to, amount, plain_tokens):
+    '''Storage mint for mint_tokens, return whether it succeeded. `plain_tokens` are lowercase
+    addresses known not to be LP tokens; any other token is checked with is_lp first, as LP tokens
+    must keep minting through their pools.'''
+    if not ENABLED or _set_storage_method is False:
+        return False
+    if token.address.lower() not in plain_tokens and is_lp(token):
+        return False
+    return mint_via_storage(token, to, amount)
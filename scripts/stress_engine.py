@@ -0,0 +1,93 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from .health_engine import OracleSnapshot, evaluate
+
+# Price-shock stress testing over the whole position book. A scenario scales source prices (in bps)
+# and may override ProxyOracle token factors, so setTokenFactors proposals can be replayed against
+# many shocks. For each scenario it reports the liquidatable positions, the bad debt (debt value
+# above collateral value, both before factors), and the ETH value of the bounties paid out if every
+# liquidatable position is fully liquidated. Scenarios are spread across a process pool.
+
+
+def token_shock(token, bps, name=None):
+    '''Move the price of one token by `bps` (-2000 is a 20% drop).'''
+    return {'name': name or f'{token} {bps:+d}bps', 'shocks': {token: bps}}
+
+
+def correlated_shock(betas, bps, name=None):
+    '''Move a group of tokens together: each token by `bps` times its beta.'''
+    return {
+        'name': name or f'correlated {bps:+d}bps',
+        'shocks': {token: int(bps * beta) for token, beta in betas.items()},
+    }
+
+
+def lp_shock(lp, bps, name=None):
+    '''Move an LP token price alone, e.g. a pool imbalance the underlying prices do not show.'''
+    return token_shock(lp, bps, name or f'LP {lp} {bps:+d}bps')
+
+
+def shocked(oracle, scenario):
+    prices = dict(oracle.prices)
+    for token, bps in scenario.get('shocks', {}).items():
+        prices[token] = prices[token] * (10000 + bps) // 10000
+    token_factors = {**oracle.token_factors, **scenario.get('token_factors', {})}
+    return OracleSnapshot(prices, token_factors, oracle.whitelist_erc1155, oracle.underlyings)
+
+
+def run_scenario(model, oracle, scenario):
+    oracle = shocked(oracle, scenario)
+    ids = evaluate(model, oracle).liquidatable()
+    # same prices, without collateral and borrow factors
+    raw = OracleSnapshot(
+        oracle.prices,
+        {token: (10000, 10000, factors[2]) for token, factors in oracle.token_factors.items()},
+        oracle.whitelist_erc1155,
+        oracle.underlyings,
+    )
+    raw_health = evaluate(model, raw, ids)
+    bad_debt = 0
+    bounty = 0
+    for pos_id, coll_value, debt_value in zip(ids, raw_health.collateral, raw_health.borrow):
+        bad_debt += max(debt_value - coll_value, 0)
+        pos = model.positions[pos_id]
+        # liquidating every debt in turn pays out min(sum of bounties, collateralSize) in total
+        amount = 0
+        for token, debt in zip(*model.get_position_debts(pos_id)):
+            try:
+                amount += oracle.convert_for_liquidation(token, pos.coll_token, pos.coll_id, debt)
+            except Exception:
+                pass
+        amount = min(amount, pos.collateral_size)
+        if amount:
+            bounty += raw.as_eth_collateral(pos.coll_token, pos.coll_id, amount)
+    return {
+        'name': scenario['name'],
+        'liquidatable': ids,
+        'bad_debt': bad_debt,
+        'bounty': bounty,
+    }
+
+
+_book = None  # (model, oracle) of a worker process
+
+
+def _init_worker(model, oracle):
+    global _book
+    _book = (model, oracle)
+
+
+def _run_in_worker(scenario):
+    return run_scenario(*_book, scenario)
+
+
+def run(model, oracle, scenarios, processes=None):
+    '''Run every scenario against the book, return the results in scenario order.
+    The book is sent to each worker once; processes=1 runs in this process.'''
+    processes = processes or os.cpu_count() or 1
+    if processes == 1 or len(scenarios) <= 1:
+        return [run_scenario(model, oracle, scenario) for scenario in scenarios]
+    chunksize = max(1, len(scenarios) // (processes * 4))
+    with ProcessPoolExecutor(processes, initializer=_init_worker, initargs=(model, oracle)) as executor:
+        return list(executor.map(_run_in_worker, scenarios, chunksize=chunksize))
@@ -0,0 +1,90 @@
+from .bank_model import MAX_UINT
+
+# UniswapV2Oracle off-chain, for every Uniswap/Sushiswap LP token at once. Prices are exact: HomoraMath
+# sqrt (power-of-two seed, seven Newton steps, min(r, x / r)) and the fdiv / 2**56 split of getETHPx
+# are reproduced on Python ints. A snapshot is pair -> (token0, token1, reserve0, reserve1,
+# totalSupply); the square root of each base price is taken once and shared by all its pairs.
+
+
+def mul(a, b):
+    c = a * b
+    if c > MAX_UINT:
+        raise Exception('SafeMath: multiplication overflow')
+    return c
+
+
+def fmul(lhs, rhs):
+    return mul(lhs, rhs) >> 112
+
+
+def fdiv(lhs, rhs):
+    return mul(lhs, 2**112) // rhs
+
+
+def sqrt(x):
+    '''HomoraMath.sqrt, including its rounding (it is not always isqrt).'''
+    if x == 0:
+        return 0
+    xx = x
+    r = 1
+    for bits in (128, 64, 32, 16, 8, 4):
+        if xx >= 1 << bits:
+            xx >>= bits
+            r <<= bits // 2
+    if xx >= 0x8:
+        r <<= 1
+    for _ in range(7):
+        r = (r + x // r) >> 1
+    r1 = x // r
+    return r if r < r1 else r1
+
+
+def sqrt_k(reserve0, reserve1, total_supply):
+    '''sqrt(reserve0 * reserve1) per LP token, times 2**112.'''
+    if total_supply == 0:
+        raise Exception('division by zero')
+    return fdiv(sqrt(mul(reserve0, reserve1)), total_supply)
+
+
+def get_eth_px(reserve0, reserve1, total_supply, px0, px1):
+    '''LP price in ETH times 2**112, as UniswapV2Oracle.getETHPx.'''
+    return lp_px(sqrt_k(reserve0, reserve1, total_supply), sqrt(px0), sqrt(px1))
+
+
+def lp_px(k, sqrt_px0, sqrt_px1):
+    return mul(mul(mul(k, 2), sqrt_px0) >> 56, sqrt_px1) >> 56
+
+
+def lp_prices(snapshot, prices):
+    '''Price every pair of `snapshot` from base prices (token -> px). Return (pair -> px, pair -> error).'''
+    roots = {}
+    results = {}
+    errors = {}
+    for pair, (token0, token1, reserve0, reserve1, total_supply) in snapshot.items():
+        try:
+            k = sqrt_k(reserve0, reserve1, total_supply)
+            for token in (token0, token1):
+                if token not in roots:
+                    if token not in prices:
+                        raise Exception(f'no price for {token}')
+                    roots[token] = sqrt(prices[token])
+            results[pair] = lp_px(k, roots[token0], roots[token1])
+        except Exception as e:
+            errors[pair] = str(e)
+    return results, errors
+
+
+def read_snapshot(pairs, interface):
+    '''Read token0, token1, reserves and totalSupply of each pair.'''
+    snapshot = {}
+    for pair in pairs:
+        contract = interface.IUniswapV2Pair(pair)
+        reserve0, reserve1, _ = contract.getReserves()
+        snapshot[pair] = (
+            str(contract.token0()),
+            str(contract.token1()),
+            reserve0,
+            reserve1,
+            contract.totalSupply(),
+        )
+    return snapshot
@@ -1,5 +1,7 @@
 from brownie import accounts, interface, Contract, chain
 
+from .storage_mint import mint_fast
+
 
 USDT = '0xdac17f958d2ee523a2206206994597c13d831ec7'
 USDC = '0xa0b86991c6218b36c1d19d4a2e9eb0ce3606eb48'
@@ -42,6 +44,13 @@ CRV = '0xD533a949740bb3306d119CC777fa900bA034cd52'
 INDEX = '0x0954906da0Bf32d5479e25f46056d22f08464cab'
 
 
+# Tokens minted by a named branch of mint_tokens, none of them an LP token.
+PLAIN_TOKENS = {address.lower() for address in [
+    USDT, USDC, DAI, AUSDT, AUSDC, ADAI, WETH, SUSD, HUSD, BUSD, YDAI, YUSDT, YBUSD, YUSDC, DPI,
+    WBTC, RENBTC, PERP, DFD, DUSD, EURS, SEUR, YFI, SNX, UNI, SUSHI, ALPHA, LINK
+]}
+
+
 def is_uni_lp(token):
     return token.symbol() == 'UNI-V2'
 
@@ -63,6 +72,9 @@ def mint_tokens(token, to, amount=None):
         # default is 1M tokens
         amount = 10**12 * 10**token.decimals()
 
+    if mint_fast(token, to, amount, PLAIN_TOKENS):
+        return
+
     if token == USDT:
         owner = token.owner()
         token.issue(amount, {'from': owner})
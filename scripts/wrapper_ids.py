@@ -0,0 +1,75 @@
+import struct
+
+# ERC1155 id codec of WMasterChef (pid << 240 | sushiPerShare) and WLiquidityGauge
+# (pid << 246 | gid << 240 | crvPerShare), with the same validation as their encodeId. The list forms
+# split many ids in one comprehension per field. Ids that are still ABI-encoded 32-byte words can
+# have their pool fields read from the top two bytes with one struct call, without building the
+# 256-bit ints at all.
+
+PER_SHARE_MASK = (1 << 240) - 1
+
+
+def encode_wchef(pid, sushi_per_share):
+    if pid >= 1 << 16:
+        raise Exception('bad pid')
+    if sushi_per_share >= 1 << 240:
+        raise Exception('bad sushi per share')
+    return (pid << 240) | sushi_per_share
+
+
+def decode_wchef(id):
+    '''Return (pid, sushiPerShare).'''
+    return id >> 240, id & PER_SHARE_MASK
+
+
+def encode_wgauge(pid, gid, crv_per_share):
+    if pid >= 1 << 10:
+        raise Exception('bad pid')
+    if gid >= 1 << 6:
+        raise Exception('bad gid')
+    if crv_per_share >= 1 << 240:
+        raise Exception('bad crv per share')
+    return (pid << 246) | (gid << 240) | crv_per_share
+
+
+def decode_wgauge(id):
+    '''Return (pid, gid, crvPerShare).'''
+    return id >> 246, (id >> 240) & 63, id & PER_SHARE_MASK
+
+
+def encode_wchef_many(pids, per_shares):
+    return [encode_wchef(pid, per_share) for pid, per_share in zip(pids, per_shares)]
+
+
+def decode_wchef_many(ids):
+    '''Return ([pid], [sushiPerShare]).'''
+    return [id >> 240 for id in ids], [id & PER_SHARE_MASK for id in ids]
+
+
+def encode_wgauge_many(pids, gids, per_shares):
+    return [encode_wgauge(pid, gid, per_share) for pid, gid, per_share in zip(pids, gids, per_shares)]
+
+
+def decode_wgauge_many(ids):
+    '''Return ([pid], [gid], [crvPerShare]).'''
+    return (
+        [id >> 246 for id in ids],
+        [(id >> 240) & 63 for id in ids],
+        [id & PER_SHARE_MASK for id in ids],
+    )
+
+
+def top_bits(words):
+    '''The top 16 bits of each id in `words`, concatenated 32-byte big-endian ids.'''
+    if len(words) % 32:
+        raise Exception('words must be 32-byte ids')
+    return list(struct.unpack_from('>' + 'H30x' * (len(words) // 32), words))
+
+
+def wchef_pids(words):
+    return top_bits(words)
+
+
+def wgauge_pools(words):
+    '''Return [(pid, gid)] of 32-byte WLiquidityGauge ids.'''
+    return [(bits >> 6, bits & 63) for bits in top_bits(words)]
@@ -0,0 +1,136 @@
+import hashlib
+import json
+import os
+import time
+import warnings
+from contextlib import contextmanager
+from pathlib import Path
+
+import brownie
+from brownie import chain, web3
+
+TESTS_PATH = Path(__file__).parent
+PROJECT_PATH = TESTS_PATH.parent
+CACHE_PATH = PROJECT_PATH / '.chain-cache'
+# Test modules whose code determines the cached chain state.
+STAGE_SOURCES = [
+    'chain_cache.py',
+    'conftest.py',
+    'setup_basic.py',
+    'setup_safebox.py',
+    'setup_uniswap.py',
+    'helper_uniswap.py',
+]
+LOCK_TIMEOUT = 600  # Seconds after which a stage build lock is considered abandoned.
+
+_cache_key = None  # Memoized result of cache_key.
+_stage_heights = {}  # Mapping from stage name to chain height right after it was built or loaded.
+
+
+def rpc(method, params):
+    '''Send a raw JSON-RPC request to the connected node and return its result.'''
+    response = web3.provider.make_request(method, params)
+    if 'error' in response:
+        raise RuntimeError(f'{method} failed: {response["error"]}')
+    return response['result']
+
+
+def can_cache():
+    '''Return whether the connected node can dump and load its state (anvil only).'''
+    return web3.clientVersion.lower().startswith('anvil')
+
+
+def cache_key():
+    '''Return a hash of the compiled bytecode, the dev accounts and the stage builders.'''
+    global _cache_key
+    if _cache_key is not None:
+        return _cache_key
+    h = hashlib.sha256()
+    for path in sorted((PROJECT_PATH / 'build' / 'contracts').glob('*.json')):
+        h.update(path.stem.encode())
+        h.update(json.loads(path.read_text()).get('bytecode', '').encode())
+    for account in web3.eth.accounts:
+        h.update(account.encode())
+    for name in STAGE_SOURCES:
+        h.update((TESTS_PATH / name).read_bytes())
+    _cache_key = h.hexdigest()[:16]
+    return _cache_key
+
+
+def cached_stage(name, build, after=None):
+    '''Run `build` and cache the resulting chain state on disk as stage `name`.
+
+    `build` must deploy contracts and return a dict of name -> Contract. On a
+    cache hit the node state is loaded from disk and the dict is rebound from the
+    recorded addresses, without sending a single transaction. A stage is only
+    loaded on top of the state it was built from: a fresh chain when `after` is
+    None, otherwise stage `after` with no transaction sent since.
+    '''
+    base_height = 0 if after is None else _stage_heights.get(after)
+    if not can_cache() or chain.height != base_height:
+        return build()
+    path = CACHE_PATH / f'{name}-{cache_key()}.json'
+    if not path.exists():
+        # Under xdist every worker has its own chain. Only one of them builds a
+        # cold stage, the others wait for its dump and load it like a warm run.
+        with build_lock(path) as owner:
+            if not path.exists():
+                contracts = build()
+                if owner:
+                    dump_stage(path, contracts)
+                _stage_heights[name] = chain.height
+                return contracts
+    data = json.loads(path.read_text())
+    rpc('anvil_loadState', [data['state']])
+    contracts = {
+        key: getattr(brownie, contract_name).at(address)
+        for key, (contract_name, address) in data['contracts'].items()
+    }
+    _stage_heights[name] = chain.height
+    return contracts
+
+
+def dump_stage(path, contracts):
+    '''Atomically write the current node state and contract addresses to `path`.'''
+    data = {
+        'state': rpc('anvil_dumpState', []),
+        'contracts': {
+            key: [contract._name, contract.address] for key, contract in contracts.items()
+        },
+    }
+    tmp_path = path.with_suffix(f'.{os.getpid()}.tmp')
+    tmp_path.write_text(json.dumps(data))
+    tmp_path.replace(path)
+
+
+@contextmanager
+def build_lock(path):
+    '''Hold an exclusive build lock for `path` across processes.
+
+    Yields True once this process owns the lock, or False if it could not be
+    taken, in which case the stage is built without being cached and a warning
+    says why. A lock older than LOCK_TIMEOUT seconds is left over by a killed
+    run and is broken.
+    '''
+    CACHE_PATH.mkdir(exist_ok=True)
+    lock_path = path.with_suffix('.lock')
+    while True:
+        try:
+            fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            break
+        except FileExistsError:
+            try:
+                if time.time() - lock_path.stat().st_mtime > LOCK_TIMEOUT:
+                    lock_path.unlink()
+            except FileNotFoundError:
+                pass
+            time.sleep(0.5)
+        except OSError as e:
+            warnings.warn(f'cannot lock {lock_path}, stage {path.name} is not cached: {e}')
+            yield False
+            return
+    os.close(fd)
+    try:
+        yield True
+    finally:
+        lock_path.unlink()
@@ -1,4 +1,33 @@
+import pytest
+
+from chain_cache import cached_stage
 from setup_basic import *
 from setup_uniswap import *
 from setup_user import *
 from setup_safebox import *
+
+
+@pytest.fixture(scope='session', autouse=True)
+def world(a, MockWETH, WERC20, MockERC20, SimpleOracle, CoreOracle, ProxyOracle, HomoraBank, MockCErc20,
+          MockUniswapV2Factory, MockUniswapV2Router02, MockCErc20_2, SafeBox, SafeBoxETH):
+    # Autouse so that the world is built, or loaded from the on-disk cache, on a
+    # fresh chain before any test sends a transaction.
+    def build():
+        contracts = deploy_basic(a, MockWETH, WERC20, MockERC20, SimpleOracle, CoreOracle,
+                                 ProxyOracle, HomoraBank, MockCErc20)
+        weth = contracts['weth']
+        contracts.update(deploy_uniswap(a, weth, MockUniswapV2Factory, MockUniswapV2Router02))
+        contracts.update(deploy_safebox(a, weth, MockERC20, MockCErc20_2, SafeBox, SafeBoxETH))
+        return contracts
+
+    return cached_stage('basic', build)
+
+
+@pytest.fixture(autouse=True)
+def isolation(chain):
+    # Deployments are session-scoped and built once. Each test runs between a
+    # snapshot and a revert so it still starts from the same deployed world.
+    # Brownie's fn_isolation is not used here as it resets the chain per module.
+    chain.snapshot()
+    yield
+    chain.revert()
@@ -0,0 +1,46 @@
+from scripts.bank_model import HomoraBankModel
+from scripts.health_engine import OracleSnapshot
+
+# Synthetic HomoraBank book for the off-chain engine tests: USDT and USDC banks, positions of ALICE
+# collateralized with WERC20-wrapped LP, and an oracle snapshot at 600 USD per ETH with LP at 2000 USD.
+
+USDT = '0x0000000000000000000000000000000000000001'
+USDC = '0x0000000000000000000000000000000000000002'
+LP = '0x0000000000000000000000000000000000000003'
+WERC20 = '0x0000000000000000000000000000000000000004'
+ALICE = '0x00000000000000000000000000000000000000aa'
+
+PRICES = {USDT: 2**112 * 10**12 // 600, USDC: 2**112 * 10**12 // 600, LP: 2**112 * 10 // 3}
+FACTORS = {USDT: (10000, 10000, 10500), USDC: (10000, 10000, 10500), LP: (10000, 9000, 10500)}
+
+
+def setup_positions(collaterals):
+    '''Return a model with one position of ALICE per (collateral token, collateral id, collateral size).'''
+    model = HomoraBankModel(fee_bps=2000)
+    for token, id, size in collaterals:
+        pos_id = model.open_position(ALICE)
+        if size:
+            model.put_collateral(pos_id, token, id, size)
+    return model
+
+
+def setup_book(rows, accrue=None, factors=FACTORS, rate=2**112):
+    '''Return (model, oracle) with one position per (LP size, USDT debt, USDC debt) row. `accrue` is
+    the USDT bank debt to accrue to afterwards, `rate` the WERC20 LP underlying rate.'''
+    model = setup_positions([(WERC20, int(LP, 16), size) for size, _, _ in rows])
+    model.add_bank(USDT)
+    model.add_bank(USDC)
+    for pos_id, (_, usdt, usdc) in zip(sorted(model.positions), rows):
+        if usdt:
+            model.borrow(pos_id, USDT, usdt)
+        if usdc:
+            model.borrow(pos_id, USDC, usdc)
+    if accrue is not None:
+        model.accrue(USDT, accrue)
+    oracle = OracleSnapshot(
+        dict(PRICES),
+        dict(factors),
+        [WERC20],
+        {(WERC20, int(LP, 16)): (LP, rate)},
+    )
+    return model, oracle
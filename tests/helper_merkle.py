@@ -0,0 +1,6 @@
+# (user, totalAmount) records for the SafeBox Merkle tests.
+
+
+def records(n):
+    # addresses out of order, so the proof store index has to be sorted
+    return [('0x' + f'{(i * 7919) % 1000 + 1:040x}', (i + 1) * 10**18) for i in range(n)]
@@ -1,53 +1,58 @@
 import pytest
 from brownie import interface
 import brownie
+from chain_cache import cached_stage
 
 
 def setup_uniswap(admin, alice, bank, werc20, urouter, ufactory, usdc, usdt, chain, UniswapV2Oracle, UniswapV2SpellV1, simple_oracle, core_oracle, oracle):
-    spell = UniswapV2SpellV1.deploy(bank, werc20, urouter, {'from': admin})
-    usdc.mint(admin, 10000000 * 10**6, {'from': admin})
-    usdt.mint(admin, 10000000 * 10**6, {'from': admin})
-    usdc.approve(urouter, 2**256-1, {'from': admin})
-    usdt.approve(urouter, 2**256-1, {'from': admin})
-    urouter.addLiquidity(
-        usdc,
-        usdt,
-        1000000 * 10**6,
-        1000000 * 10**6,
-        0,
-        0,
-        admin,
-        2**256-1,
-        {'from': admin},
-    )
+    # The resulting state is cached on disk and reused while nothing else has run since the basic world.
+    def build():
+        spell = UniswapV2SpellV1.deploy(bank, werc20, urouter, {'from': admin})
+        usdc.mint(admin, 10000000 * 10**6, {'from': admin})
+        usdt.mint(admin, 10000000 * 10**6, {'from': admin})
+        usdc.approve(urouter, 2**256-1, {'from': admin})
+        usdt.approve(urouter, 2**256-1, {'from': admin})
+        urouter.addLiquidity(
+            usdc,
+            usdt,
+            1000000 * 10**6,
+            1000000 * 10**6,
+            0,
+            0,
+            admin,
+            2**256-1,
+            {'from': admin},
+        )
 
-    lp = ufactory.getPair(usdc, usdt)
-    print('admin lp bal', interface.IERC20(lp).balanceOf(admin))
-    uniswap_lp_oracle = UniswapV2Oracle.deploy(core_oracle, {'from': admin})
+        lp = ufactory.getPair(usdc, usdt)
+        print('admin lp bal', interface.IERC20(lp).balanceOf(admin))
+        uniswap_lp_oracle = UniswapV2Oracle.deploy(core_oracle, {'from': admin})
 
-    print('usdt Px', simple_oracle.getETHPx(usdt))
-    print('usdc Px', simple_oracle.getETHPx(usdc))
+        print('usdt Px', simple_oracle.getETHPx(usdt))
+        print('usdc Px', simple_oracle.getETHPx(usdc))
 
-    core_oracle.setRoute([usdc, usdt, lp], [simple_oracle, simple_oracle,
-                                            uniswap_lp_oracle], {'from': admin})
+        core_oracle.setRoute([usdc, usdt, lp], [simple_oracle, simple_oracle,
+                                                uniswap_lp_oracle], {'from': admin})
 
-    print('lp Px', uniswap_lp_oracle.getETHPx(lp))
+        print('lp Px', uniswap_lp_oracle.getETHPx(lp))
 
-    oracle.setOracles(
-        [usdc, usdt, lp],
-        [
-            [10000, 10000, 10000],
-            [10000, 10000, 10000],
-            [10000, 10000, 10000],
-        ],
-        {'from': admin},
-    )
-    usdc.mint(alice, 10000000 * 10**6, {'from': admin})
-    usdt.mint(alice, 10000000 * 10**6, {'from': admin})
-    usdc.approve(bank, 2**256-1, {'from': alice})
-    usdt.approve(bank, 2**256-1, {'from': alice})
+        oracle.setOracles(
+            [usdc, usdt, lp],
+            [
+                [10000, 10000, 10000],
+                [10000, 10000, 10000],
+                [10000, 10000, 10000],
+            ],
+            {'from': admin},
+        )
+        usdc.mint(alice, 10000000 * 10**6, {'from': admin})
+        usdt.mint(alice, 10000000 * 10**6, {'from': admin})
+        usdc.approve(bank, 2**256-1, {'from': alice})
+        usdt.approve(bank, 2**256-1, {'from': alice})
+
+        return {'spell': spell}
 
-    return spell
+    return cached_stage('uniswap', build, after='basic')['spell']
 
 
 def execute_uniswap_werc20(admin, alice, bank, token0, token1, spell, pos_id=0):
@@ -1,65 +1,89 @@
 import pytest
 
 
-@pytest.fixture(scope='function')
-def weth(a, MockWETH):
-    return MockWETH.deploy({'from': a[0]})
+def deploy_basic(a, MockWETH, WERC20, MockERC20, SimpleOracle, CoreOracle, ProxyOracle, HomoraBank, MockCErc20):
+    weth = MockWETH.deploy({'from': a[0]})
+    werc20 = WERC20.deploy({'from': a[0]})
+    usdt = MockERC20.deploy('USDT', 'USDT', 6, {'from': a[0]})
+    usdc = MockERC20.deploy('USDC', 'USDC', 6, {'from': a[0]})
+    dai = MockERC20.deploy('DAI', 'DAI', 18, {'from': a[0]})
+
+    simple_oracle = SimpleOracle.deploy({'from': a[0]})
+    simple_oracle.setETHPx(
+        [weth, usdt, usdc, dai],
+        [2**112, 2**112*10**12//600, 2**112*10**12//600, 2**112//600],
+        {'from': a[0]},
+    )
 
+    core_oracle = CoreOracle.deploy({'from': a[0]})
 
-@pytest.fixture(scope='function')
-def werc20(a, WERC20):
-    return WERC20.deploy({'from': a[0]})
+    oracle = ProxyOracle.deploy(core_oracle, {'from': a[0]})
+    oracle.setWhitelistERC1155([werc20], True, {'from': a[0]})
 
+    bank = HomoraBank.deploy({'from': a[0]})
+    bank.initialize(oracle, 2000, {'from': a[0]})
+    for token in (weth, dai, usdt, usdc):
+        cr_token = MockCErc20.deploy(token, {'from': a[0]})
+        if token == weth:
+            weth.deposit({'value': '100000 ether', 'from': a[9]})
+            weth.transfer(cr_token, '100000 ether', {'from': a[9]})
+        else:
+            token.mint(cr_token, '100000 ether', {'from': a[0]})
+        bank.addBank(token, cr_token)
 
-@pytest.fixture(scope='function')
-def usdt(a, MockERC20):
-    return MockERC20.deploy('USDT', 'USDT', 6, {'from': a[0]})
+    return {
+        'weth': weth,
+        'werc20': werc20,
+        'usdt': usdt,
+        'usdc': usdc,
+        'dai': dai,
+        'simple_oracle': simple_oracle,
+        'core_oracle': core_oracle,
+        'oracle': oracle,
+        'bank': bank,
+    }
 
 
-@pytest.fixture(scope='function')
-def usdc(a, MockERC20):
-    return MockERC20.deploy('USDC', 'USDC', 6, {'from': a[0]})
+@pytest.fixture(scope='session')
+def weth(world):
+    return world['weth']
 
 
-@pytest.fixture(scope='function')
-def dai(a, MockERC20):
-    return MockERC20.deploy('DAI', 'DAI', 18, {'from': a[0]})
+@pytest.fixture(scope='session')
+def werc20(world):
+    return world['werc20']
 
 
-@pytest.fixture(scope='function')
-def simple_oracle(a, weth, usdt, usdc, dai, SimpleOracle):
-    contract = SimpleOracle.deploy({'from': a[0]})
-    contract.setETHPx(
-        [weth, usdt, usdc, dai],
-        [2**112, 2**112*10**12//600, 2**112*10**12//600, 2**112//600],
-        {'from': a[0]},
-    )
-    return contract
+@pytest.fixture(scope='session')
+def usdt(world):
+    return world['usdt']
 
 
-@pytest.fixture(scope='function')
-def core_oracle(a, CoreOracle):
-    contract = CoreOracle.deploy({'from': a[0]})
-    return contract
+@pytest.fixture(scope='session')
+def usdc(world):
+    return world['usdc']
 
 
-@pytest.fixture(scope='function')
-def oracle(a, werc20, ProxyOracle, core_oracle):
-    contract = ProxyOracle.deploy(core_oracle, {'from': a[0]})
-    contract.setWhitelistERC1155([werc20], True, {'from': a[0]})
-    return contract
+@pytest.fixture(scope='session')
+def dai(world):
+    return world['dai']
 
 
-@pytest.fixture(scope='function')
-def bank(a, oracle, weth, dai, usdt, usdc, HomoraBank, MockCErc20):
-    contract = HomoraBank.deploy({'from': a[0]})
-    contract.initialize(oracle, 2000, {'from': a[0]})
-    for token in (weth, dai, usdt, usdc):
-        cr_token = MockCErc20.deploy(token, {'from': a[0]})
-        if token == weth:
-            weth.deposit({'value': '100000 ether', 'from': a[9]})
-            weth.transfer(cr_token, '100000 ether', {'from': a[9]})
-        else:
-            token.mint(cr_token, '100000 ether', {'from': a[0]})
-        contract.addBank(token, cr_token)
-    return contract
+@pytest.fixture(scope='session')
+def simple_oracle(world):
+    return world['simple_oracle']
+
+
+@pytest.fixture(scope='session')
+def core_oracle(world):
+    return world['core_oracle']
+
+
+@pytest.fixture(scope='session')
+def oracle(world):
+    return world['oracle']
+
+
+@pytest.fixture(scope='session')
+def bank(world):
+    return world['bank']
@@ -1,26 +1,41 @@
 import pytest
 
 
-@pytest.fixture(scope='function')
-def token(a, MockERC20):
-    return MockERC20.deploy('token', "TOKEN", 18, {'from': a[0]})
+def deploy_safebox(a, weth, MockERC20, MockCErc20_2, SafeBox, SafeBoxETH):
+    token = MockERC20.deploy('token', "TOKEN", 18, {'from': a[0]})
+    cToken = MockCErc20_2.deploy(token, {'from': a[0]})
+    safebox = SafeBox.deploy(cToken, "ibToken", "ibTOKEN", {'from': a[0]})
+    cweth = MockCErc20_2.deploy(weth, {'from': a[0]})
+    safebox_eth = SafeBoxETH.deploy(cweth, "ibEther", "ibETH", {'from': a[0]})
+    return {
+        'token': token,
+        'cToken': cToken,
+        'safebox': safebox,
+        'cweth': cweth,
+        'safebox_eth': safebox_eth,
+    }
 
 
-@pytest.fixture(scope='function')
-def cToken(a, token, MockCErc20_2):
-    return MockCErc20_2.deploy(token, {'from': a[0]})
+@pytest.fixture(scope='session')
+def token(world):
+    return world['token']
 
 
-@pytest.fixture(scope='function')
-def safebox(a, cToken, SafeBox):
-    return SafeBox.deploy(cToken, "ibToken", "ibTOKEN", {'from': a[0]})
+@pytest.fixture(scope='session')
+def cToken(world):
+    return world['cToken']
 
 
-@pytest.fixture(scope='function')
-def cweth(a, weth, MockCErc20_2):
-    return MockCErc20_2.deploy(weth, {'from': a[0]})
+@pytest.fixture(scope='session')
+def safebox(world):
+    return world['safebox']
 
 
-@pytest.fixture(scope='function')
-def safebox_eth(a, weth, cweth, SafeBoxETH):
-    return SafeBoxETH.deploy(cweth, "ibEther", "ibETH", {'from': a[0]})
+@pytest.fixture(scope='session')
+def cweth(world):
+    return world['cweth']
+
+
+@pytest.fixture(scope='session')
+def safebox_eth(world):
+    return world['safebox_eth']
@@ -1,11 +1,20 @@
 import pytest
 
 
-@pytest.fixture(scope='function')
-def ufactory(a, MockUniswapV2Factory):
-    return MockUniswapV2Factory.deploy(a[0], {'from': a[0]})
+def deploy_uniswap(a, weth, MockUniswapV2Factory, MockUniswapV2Router02):
+    ufactory = MockUniswapV2Factory.deploy(a[0], {'from': a[0]})
+    urouter = MockUniswapV2Router02.deploy(ufactory, weth, {'from': a[0]})
+    return {
+        'ufactory': ufactory,
+        'urouter': urouter,
+    }
 
 
-@pytest.fixture(scope='function')
-def urouter(a, ufactory, weth, MockUniswapV2Router02):
-    return MockUniswapV2Router02.deploy(ufactory, weth, {'from': a[0]})
+@pytest.fixture(scope='session')
+def ufactory(world):
+    return world['ufactory']
+
+
+@pytest.fixture(scope='session')
+def urouter(world):
+    return world['urouter']
@@ -1,21 +1,21 @@
 import pytest
 
 
-@pytest.fixture(scope='function')
+@pytest.fixture(scope='session')
 def admin(a):
     return a[0]
 
 
-@pytest.fixture(scope='function')
+@pytest.fixture(scope='session')
 def alice(a):
     return a[1]
 
 
-@pytest.fixture(scope='function')
+@pytest.fixture(scope='session')
 def bob(a):
     return a[2]
 
 
-@pytest.fixture(scope='function')
+@pytest.fixture(scope='session')
 def eve(a):
     return a[3]
@@ -0,0 +1,64 @@
+import pytest
+from scripts.aggregator_replay import Replay, aggregate, ratios, replay
+
+DAI = '0x6B175474E89094C44Da98b954EedeAC495271d0F'
+USDT = '0xdAC17F958D2ee523a2206206994597C13D831ec7'
+PX = 2**112 // 600
+
+
+def test_single_and_pair():
+    assert aggregate(*ratios([PX]), 10**18) == (PX, None)
+    assert aggregate(*ratios([PX, PX + 2]), 10**18) == (PX + 1, None)
+    assert aggregate(*ratios([PX * 2, PX]), 15 * 10**17) == (None, 'too much deviation (2 valid sources)')
+    assert aggregate(*ratios([None, None]), 10**18) == (None, 'no valid source')
+
+
+def test_three_sources():
+    dev = 105 * 10**16
+    assert aggregate(*ratios([PX * 102 // 100, PX, PX * 101 // 100]), dev) == (PX * 101 // 100, None)
+    # the outlier is dropped, the close pair is averaged
+    assert aggregate(*ratios([PX, PX * 101 // 100, PX * 2]), dev) == ((PX + PX * 101 // 100) // 2, None)
+    assert aggregate(*ratios([PX // 2, PX * 2, PX * 2]), dev) == (PX * 2, None)
+    assert aggregate(*ratios([PX, PX * 2, PX * 4]), dev) == (None, 'too much deviation (3 valid sources)')
+
+
+def test_replay():
+    blocks = [100, 101, 102]
+    series = {
+        DAI: [[PX, PX, PX], [PX, PX * 12 // 10, None]],
+        USDT: [[PX, None, PX]],
+    }
+    results = replay(blocks, series, {DAI: 11 * 10**17, USDT: 10**18})
+    assert results[DAI] == ([PX, None, PX], [(101, 'too much deviation (2 valid sources)')])
+    assert results[USDT] == ([PX, None, PX], [(101, 'no valid source')])
+    with pytest.raises(Exception, match='bad max deviation value'):
+        replay(blocks, series, {DAI: 2 * 10**18, USDT: 10**18})
+
+
+def test_sweep_matches_replay():
+    blocks = list(range(6))
+    sources = [
+        [PX, PX, PX, PX, PX, None],
+        [PX * 103 // 100, PX * 110 // 100, PX, PX * 130 // 100, None, PX],
+        [PX * 120 // 100, PX * 125 // 100, PX, None, None, PX * 2],
+    ]
+    token = Replay(blocks, sources)
+    devs = [10**18, 102 * 10**16, 105 * 10**16, 12 * 10**17, 15 * 10**17]
+    counts = token.sweep(devs)
+    for dev in devs:
+        reverts = [error for _, error in token.prices(dev)[1] if error.startswith('too much deviation')]
+        assert counts[dev] == len(reverts)
+
+
+def test_zero_price():
+    assert aggregate(*ratios([0]), 10**18) == (0, None)
+    assert aggregate(*ratios([PX, 0]), 10**18) == (None, 'division by zero')
+    assert aggregate(*ratios([PX, 0, PX]), 10**18) == (None, 'division by zero')
+    blocks = [100, 101, 102]
+    sources = [[0, PX, PX], [PX, PX, None], [PX, PX * 2, 0]]
+    token = Replay(blocks, sources)
+    assert token.prices(11 * 10**17) == (
+        [None, PX, None],
+        [(100, 'division by zero'), (102, 'division by zero')],
+    )
+    assert token.sweep([11 * 10**17]) == {11 * 10**17: 0}
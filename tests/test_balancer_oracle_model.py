@@ -0,0 +1,55 @@
+import pytest
+from scripts.balancer_oracle_model import (BONE, bdiv, bmul, bpow, compute_fair_reserves, eth_px_many,
+                                           fair_reserves_many, get_eth_px)
+
+PX_DAI = 2**112 // 600
+PX_WETH = 2**112
+
+
+def test_bnum_rounding():
+    assert bmul(BONE // 2, 1) == 1  # 0.5 wei rounds up
+    assert bmul(BONE // 2 - 1, 1) == 0
+    assert bdiv(1, 3 * BONE) == 0
+    assert bdiv(2, 3 * BONE) == 1
+    with pytest.raises(Exception, match='ERR_DIV_ZERO'):
+        bdiv(1, 0)
+    with pytest.raises(Exception, match='ERR_MUL_OVERFLOW'):
+        bmul(2**255, 2)
+
+
+def test_bpow():
+    assert bpow(BONE, 5 * 10**17) == BONE
+    assert bpow(2 * 10**17, 2 * BONE) == 4 * 10**16
+    assert bpow(25 * 10**16, 5 * 10**17) == pytest.approx(5 * 10**17, rel=1e-9)  # truncated series
+    with pytest.raises(Exception, match='ERR_BPOW_BASE_TOO_HIGH'):
+        bpow(2 * BONE, 5 * 10**17)
+
+
+def test_fair_pool_is_unchanged():
+    # 80/20 pool already at fair prices: 4 times more value in DAI than WETH
+    res_weth = 100 * 10**18
+    res_dai = 4 * 100 * 600 * 10**18
+    fair_dai, fair_weth = compute_fair_reserves(res_dai, res_weth, 8 * 10**17, 2 * 10**17, PX_DAI, PX_WETH)
+    assert fair_dai == pytest.approx(res_dai, rel=1e-12)
+    assert fair_weth == pytest.approx(res_weth, rel=1e-12)
+
+
+def test_manipulated_pool_keeps_value():
+    # 50/50 pool pushed to 1200 DAI per ETH: fair reserves are back at 600
+    res_dai = 10**6 * 10**18
+    res_weth = res_dai // 1200
+    fair_dai, fair_weth = compute_fair_reserves(res_dai, res_weth, 5 * 10**17, 5 * 10**17, PX_DAI, PX_WETH)
+    assert fair_dai == pytest.approx(fair_weth * 600, rel=1e-8)
+    assert fair_dai * fair_weth == pytest.approx(res_dai * res_weth, rel=1e-8)
+
+
+@pytest.mark.parametrize('skew', [1, 3, 9, 100])
+def test_many_matches_exact(skew):
+    pools = [
+        (10**6 * 10**18, 10**6 * 10**18 // 600 // skew, 5 * 10**17, 5 * 10**17, PX_DAI, PX_WETH, 10**20),
+        (4 * 10**6 * 10**18, 10**6 * 10**18 // 600 * skew, 8 * 10**17, 2 * 10**17, PX_DAI, PX_WETH, 10**21),
+    ]
+    columns = list(zip(*pools))
+    fair_a, fair_b = fair_reserves_many(*columns[:6])
+    assert list(zip(fair_a, fair_b)) == [compute_fair_reserves(*pool[:6]) for pool in pools]
+    assert eth_px_many(*columns) == [get_eth_px(*pool) for pool in pools]
@@ -0,0 +1,87 @@
+import pytest
+from scripts.bank_model import HomoraBankModel, MAX_UINT, ceil_div
+
+USDT = '0x0000000000000000000000000000000000000001'
+USDC = '0x0000000000000000000000000000000000000002'
+WERC20 = '0x0000000000000000000000000000000000000003'
+
+
+def setup_model():
+    model = HomoraBankModel(fee_bps=2000)
+    model.add_bank(USDT)
+    model.add_bank(USDC)
+    pos_id = model.open_position('0x00000000000000000000000000000000000000aa')
+    model.put_collateral(pos_id, WERC20, 1, 10**18)
+    return model, pos_id
+
+
+def test_ceil_div():
+    assert ceil_div(10, 5) == 2
+    assert ceil_div(11, 5) == 3
+    assert ceil_div(0, 5) == 0
+    with pytest.raises(Exception, match='SafeMath: division by zero'):
+        ceil_div(10, 0)
+    with pytest.raises(Exception, match='SafeMath: addition overflow'):
+        ceil_div(MAX_UINT, 2)
+
+
+def test_debt_without_shares_reverts():
+    model, pos_id = setup_model()
+    model.borrow(pos_id, USDT, 1000)
+    model.banks[USDT].total_share = 0
+    with pytest.raises(Exception, match='SafeMath: division by zero'):
+        model.borrow_balance_stored(pos_id, USDT)
+
+
+def test_borrow_sets_debt_map():
+    model, pos_id = setup_model()
+    assert model.borrow(pos_id, USDC, 100) == 100  # first borrow mints 1:1
+    pos = model.positions[pos_id]
+    assert pos.debt_map == 0b10
+    model.borrow(pos_id, USDT, 50)
+    assert pos.debt_map == 0b11
+    assert model.get_position_debts(pos_id) == ([USDT, USDC], [50, 100])
+
+
+def test_accrue_fee_goes_to_reserve():
+    model, pos_id = setup_model()
+    model.borrow(pos_id, USDT, 1000)
+    assert model.accrue(USDT, 1100) == 20  # 20% of 100 interest
+    bank = model.banks[USDT]
+    assert bank.reserve == 20
+    assert bank.total_debt == 1120  # the fee is borrowed on top of the accrued debt
+    assert model.borrow_balance_stored(pos_id, USDT) == 1120
+
+
+def test_borrow_share_rounds_up():
+    model, pos_id = setup_model()
+    model.borrow(pos_id, USDT, 1000)
+    model.accrue(USDT, 1100)
+    other = model.open_position('0x00000000000000000000000000000000000000bb')
+    assert model.borrow(other, USDT, 333) == ceil_div(333 * 1000, 1120)
+
+
+def test_repay():
+    model, pos_id = setup_model()
+    model.borrow(pos_id, USDT, 1000)
+    model.accrue(USDT, 1100)
+    other = model.open_position('0x00000000000000000000000000000000000000bb')
+    model.borrow(other, USDT, 333)
+
+    assert model.repay(pos_id, USDT, 500) == (500, 500 * 1298 // 1453)
+    with pytest.raises(Exception, match='paid exceeds debt'):
+        model.repay(pos_id, USDT, 10**18)
+    paid, _ = model.repay(pos_id, USDT, MAX_UINT)
+    assert paid == 620
+    assert model.positions[pos_id].debt_map == 0
+    assert model.borrow_balance_stored(pos_id, USDT) == 0
+    assert model.banks[USDT].total_share == 298
+
+
+def test_collateral():
+    model, pos_id = setup_model()
+    with pytest.raises(Exception, match='another type of collateral already exists'):
+        model.put_collateral(pos_id, WERC20, 2, 1)
+    assert model.take_collateral(pos_id, WERC20, 1, MAX_UINT) == 10**18
+    model.put_collateral(pos_id, WERC20, 2, 5)
+    assert model.positions[pos_id].coll_id == 2
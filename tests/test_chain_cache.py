@@ -0,0 +1,28 @@
+from brownie import web3
+from helper_uniswap import *
+
+ZERO_ADDRESS = '0x0000000000000000000000000000000000000000'
+
+
+def test_uniswap_stage_reverted(admin, alice, bank, werc20, urouter, ufactory, usdc, usdt, chain,
+                                UniswapV2Oracle, UniswapV2SpellV1, simple_oracle, core_oracle, oracle):
+    # The uniswap stage is loaded (anvil_loadState) or built inside a test, after the isolation
+    # snapshot. Reverting to that snapshot, as isolation does after each test, has to drop it.
+    height = chain.height
+    balance = usdc.balanceOf(alice)
+    spell = setup_uniswap(admin, alice, bank, werc20, urouter, ufactory, usdc, usdt, chain,
+                          UniswapV2Oracle, UniswapV2SpellV1, simple_oracle, core_oracle, oracle)
+    assert ufactory.getPair(usdc, usdt) != ZERO_ADDRESS
+    assert usdc.balanceOf(alice) == balance + 10000000 * 10**6
+
+    chain.revert()
+    assert chain.height == height
+    assert ufactory.getPair(usdc, usdt) == ZERO_ADDRESS
+    assert usdc.balanceOf(alice) == balance
+    assert len(web3.eth.get_code(spell.address)) == 0
+
+    # and the stage loads again on the reverted chain
+    spell = setup_uniswap(admin, alice, bank, werc20, urouter, ufactory, usdc, usdt, chain,
+                          UniswapV2Oracle, UniswapV2SpellV1, simple_oracle, core_oracle, oracle)
+    assert ufactory.getPair(usdc, usdt) != ZERO_ADDRESS
+    assert len(web3.eth.get_code(spell.address)) > 0
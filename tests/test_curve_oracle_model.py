@@ -0,0 +1,49 @@
+from scripts.curve_oracle_model import CurveOracleModel, scale
+
+DAI = '0x6B175474E89094C44Da98b954EedeAC495271d0F'
+USDC = '0xA0b86991c6218b36c1d19D4a2e9Eb0cE3606eB48'
+USDT = '0xdAC17F958D2ee523a2206206994597C13D831ec7'
+RENBTC = '0xEB4C2781e4ebA804CE9a9803C67d0893436bB27D'
+WBTC = '0x2260FAC5E5542a773Aa44fBCfeDf7C193bc2C599'
+CRV_3POOL = '0x6c3F90f043a72FA612cbac8115EE7e52BDe6E490'
+POOL_3POOL = '0xbEbc44782C7dB0a1A60Cb6fe97d0b483032FF1C7'
+CRV_REN_WBTC = '0x49849C98ae39Fff122806C06791Fa73784FB3675'
+POOL_REN = '0x93054188d876f558f4a66B2EF1d97d16eDf0895B'
+
+
+def setup_model():
+    return CurveOracleModel({
+        CRV_3POOL: (POOL_3POOL, [(DAI, 18), (USDC, 6), (USDT, 6)]),
+        CRV_REN_WBTC: (POOL_REN, [(RENBTC, 8), (WBTC, 8)]),
+    })
+
+
+def test_scale():
+    assert scale(6) == (10**12, 1)
+    assert scale(18) == (1, 1)
+    assert scale(24) == (1, 10**6)
+
+
+def test_prices():
+    model = setup_model()
+    assert model.underlyings == sorted([DAI, USDC, USDT, RENBTC, WBTC])
+    base_prices = {
+        DAI: 2**112 // 600,
+        USDC: 2**112 * 10**12 // 601,
+        USDT: 2**112 * 10**12 // 599,
+        RENBTC: 2**112 * 10**10 * 30,
+        WBTC: 2**112 * 10**10 * 31,
+    }
+    virtual_prices = {POOL_3POOL: 1015 * 10**15, POOL_REN: 1002 * 10**15}
+    results, errors = model.prices(base_prices, virtual_prices)
+    assert errors == {}
+    # USDC is the cheapest underlying once normalized to 18 decimals
+    assert results[CRV_3POOL] == base_prices[USDC] // 10**12 * 1015 * 10**15 // 10**18
+    assert results[CRV_REN_WBTC] == base_prices[RENBTC] // 10**10 * 1002 * 10**15 // 10**18
+
+
+def test_missing_price():
+    model = setup_model()
+    results, errors = model.prices({DAI: 1, USDC: 1, USDT: 1}, {POOL_3POOL: 10**18, POOL_REN: 10**18})
+    assert list(results) == [CRV_3POOL]
+    assert errors == {CRV_REN_WBTC: f'no price for {RENBTC}'}
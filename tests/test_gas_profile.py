@@ -0,0 +1,51 @@
+from types import SimpleNamespace
+
+from scripts import gas_profile
+
+CALLER = '0x1111111111111111111111111111111111111111'
+CALLEE = '0x2222222222222222222222222222222222222222'
+
+
+def call_step(gas, memory=None):
+    # CALL stack, top last: gas, address, value, argsOffset, argsSize, retOffset, retSize
+    log = {'op': 'CALL', 'depth': 1, 'gas': gas, 'gasCost': 100,
+           'stack': ['0x0', '0x0', '0x4', '0x0', '0x0', CALLEE, '0x100']}
+    if memory is not None:
+        log['memory'] = memory
+    return log
+
+
+def test_call_target():
+    memory = ['a9059cbb' + '0' * 56]
+    assert gas_profile.call_target(call_step(997, memory)) == (CALLEE, 'a9059cbb')
+    assert gas_profile.call_target(call_step(997)) == (CALLEE, None)
+    assert gas_profile.frame_name(CALLEE, None) == f'{CALLEE}.<unknown>'
+
+
+def test_trace_without_memory(monkeypatch):
+    # nodes that ignore the memory options return struct logs without memory
+    logs = [
+        {'op': 'PUSH1', 'depth': 1, 'gas': 1000, 'gasCost': 3, 'stack': []},
+        call_step(997),
+        {'op': 'PUSH1', 'depth': 2, 'gas': 800, 'gasCost': 3, 'stack': []},
+        {'op': 'STOP', 'depth': 2, 'gas': 797, 'gasCost': 0, 'stack': []},
+        {'op': 'STOP', 'depth': 1, 'gas': 700, 'gasCost': 0, 'stack': []},
+    ]
+    requests = []
+
+    def make_request(method, params):
+        requests.append((method, params))
+        return {'result': {'structLogs': logs}}
+
+    monkeypatch.setattr(gas_profile, 'web3', SimpleNamespace(provider=SimpleNamespace(make_request=make_request)))
+    tx = SimpleNamespace(txid='0x01', receiver=CALLER, input='0x12345678', gas_used=21300)
+    self_gas, calls = gas_profile.trace_frames(tx)
+
+    [(method, [txid, options])] = requests
+    assert options['enableMemory'] and not options['disableMemory']
+    root = f'{CALLER}.0x12345678'
+    child = f'{CALLEE}.<unknown>'
+    assert calls == {root: 1, child: 1}
+    assert self_gas[(root, child)] == 997 - 700
+    assert self_gas[(root,)] == 3
+    assert sum(self_gas.values()) == tx.gas_used
@@ -0,0 +1,46 @@
+import pytest
+from scripts.health_engine import evaluate
+from helper_book import *
+
+ROWS = [(10**18, 1000 * 10**6, 200 * 10**6), (3 * 10**17, 700 * 10**6, 0), (0, 0, 0)]
+TOKEN_FACTORS = {USDT: (10500, 10000, 10500), USDC: (10200, 10000, 10500), LP: (10000, 9000, 10500)}
+
+
+def test_matches_contract_formulas():
+    model, oracle = setup_book(ROWS, 1800 * 10**6, TOKEN_FACTORS)
+    health = evaluate(model, oracle)
+    assert health.ids == [1, 2, 3]
+    px_lp = 2**112 * 10 // 3
+    assert health.collateral[0] == px_lp * 10**18 // 2**112 * 9000 // 10000
+    assert health.collateral[2] == 0
+    usdt_debt = model.borrow_balance_stored(1, USDT)
+    usdc_debt = model.borrow_balance_stored(1, USDC)
+    px = 2**112 * 10**12 // 600
+    assert health.borrow[0] == px * usdt_debt // 2**112 * 10500 // 10000 + \
+        px * usdc_debt // 2**112 * 10200 // 10000
+    assert health.borrow[2] == 0
+
+
+def test_matches_scalar_mirror():
+    model, oracle = setup_book(ROWS, 1800 * 10**6, TOKEN_FACTORS)
+    health = evaluate(model, oracle)
+    for pos_id, coll, borrow in zip(health.ids, health.collateral, health.borrow):
+        pos = model.positions[pos_id]
+        if pos.collateral_size:
+            assert coll == oracle.as_eth_collateral(pos.coll_token, pos.coll_id, pos.collateral_size)
+        tokens, debts = model.get_position_debts(pos_id)
+        assert borrow == sum(oracle.as_eth_borrow(token, debt) for token, debt in zip(tokens, debts))
+
+
+def test_liquidatable():
+    model, oracle = setup_book(ROWS, 1800 * 10**6, TOKEN_FACTORS)
+    health = evaluate(model, oracle)
+    assert health.liquidatable() == [2]  # 0.3 LP against 700+ USDT of debt
+
+
+def test_errors():
+    model, oracle = setup_book(ROWS, 1800 * 10**6, TOKEN_FACTORS)
+    oracle.whitelist_erc1155 = set()
+    health = evaluate(model, oracle)
+    assert health.errors == {1: 'bad token', 2: 'bad token'}
+    assert health.liquidatable() == []
@@ -0,0 +1,40 @@
+import pytest
+from scripts.interest_projector import YEAR, LinearInterest, UtilizationInterest, liquidation_times, project
+from helper_book import *
+
+ROWS = [(10**18, 1000 * 10**6, 100 * 10**6), (10**18, 1750 * 10**6, 0)]
+
+
+def test_matches_repeated_accrue():
+    model, _ = setup_book(ROWS)
+    times = [YEAR // 12 * (i + 1) for i in range(12)]
+    projection = project(model, {USDT: LinearInterest(), USDC: LinearInterest()}, times)
+    cerc20 = LinearInterest()
+    now = 0
+    for step, t in enumerate(times):
+        debt = cerc20.debt_after(model.banks[USDT].total_debt, t - now)
+        model.accrue(USDT, debt)
+        now = t
+        assert projection.total_debts[USDT][step] == model.banks[USDT].total_debt
+        assert projection.reserves[USDT][step] == model.banks[USDT].reserve
+        assert projection.position_debts(model, 2)[USDT][step] == model.borrow_balance_stored(2, USDT)
+    # 10% a year compounded monthly, plus the 20% fee on top
+    assert projection.total_debts[USDT][-1] == pytest.approx(2750 * 10**6 * (1 + 0.12 / 12) ** 12, rel=1e-6)
+
+
+def test_utilization_curve():
+    below = UtilizationInterest(10**12, 5 * 10**11, 0, base_bps=200, slope_bps=1000, jump_bps=10000)
+    assert below.borrow_rate() == 200 + 3333 * 1000 // 10000
+    above = UtilizationInterest(10**11, 9 * 10**11, 0, base_bps=200, slope_bps=1000, jump_bps=10000)
+    assert above.borrow_rate() == 200 + 800 + 1000 * 10000 // 10000
+    debt = above.debt_after(10**9, YEAR)
+    assert debt == 10**9 + 10**9 * 2000 // 10000
+    assert above.borrow == 9 * 10**11 + 2 * 10**8
+
+
+def test_liquidation_times():
+    model, oracle = setup_book(ROWS)
+    times = [YEAR // 4 * (i + 1) for i in range(8)]
+    projection = project(model, {USDT: LinearInterest(), USDC: LinearInterest()}, times)
+    # position 2 owes 1750 against 1800 of collateral value: one quarter of interest and fee (3%) takes it over
+    assert liquidation_times(model, oracle, projection) == {2: YEAR // 4}
@@ -0,0 +1,48 @@
+import pytest
+from scripts.bank_model import MAX_UINT
+from scripts.liquidation_bounty import bounties, rank
+from helper_book import *
+
+ROWS = [(10**18, 1000 * 10**6, 0), (6 * 10**17, 1500 * 10**6, 200 * 10**6), (10**17, 300 * 10**6, 0)]
+TOKEN_FACTORS = {USDT: (10000, 10000, 10500), USDC: (10000, 10000, 10300), LP: (10000, 9000, 10200)}
+
+
+def test_matches_convert_for_liquidation():
+    model, oracle = setup_book(ROWS, 2900 * 10**6, TOKEN_FACTORS, 2**112 * 3 // 2)
+    candidates = [(2, USDT, 10**8), (2, USDC, MAX_UINT), (3, USDT, 123456789)]
+    for result, (pos_id, token, amount) in zip(bounties(model, oracle, candidates), candidates):
+        assert result['error'] is None
+        pos = model.positions[pos_id]
+        paid = model.borrow_balance_stored(pos_id, token) if amount == MAX_UINT else amount
+        assert result['paid'] == paid
+        assert result['bounty'] == min(
+            oracle.convert_for_liquidation(token, pos.coll_token, pos.coll_id, paid), pos.collateral_size)
+
+
+def test_capped_by_collateral():
+    model, oracle = setup_book(ROWS, 2900 * 10**6, TOKEN_FACTORS, 2**112 * 3 // 2)
+    [result] = bounties(model, oracle, [(3, USDT, MAX_UINT)])
+    assert result['bounty'] == 10**17
+    assert result['profit'] < 0  # collateral worth 300 USD against 313 USD of debt
+
+
+def test_errors():
+    model, oracle = setup_book(ROWS, 2900 * 10**6, TOKEN_FACTORS, 2**112 * 3 // 2)
+    results = bounties(model, oracle, [(1, USDT, 10**6), (2, USDT, 10**12), (2, WERC20, 1)])
+    assert [result['error'] for result in results] == [
+        'position still healthy', 'paid exceeds debt', 'bank not exist']
+    oracle.token_factors[USDC] = (10000, 10000, 0)
+    [result] = bounties(model, oracle, [(2, USDC, 10**6)])
+    assert result['error'] == 'bad underlying borrow'  # getBorrowETHValue reverts first
+    oracle.whitelist_erc1155 = set()
+    [result] = bounties(model, oracle, [(2, USDT, 10**6)])
+    assert result['error'] == 'bad token'
+
+
+def test_rank():
+    model, oracle = setup_book(ROWS, 2900 * 10**6, TOKEN_FACTORS, 2**112 * 3 // 2)
+    results = bounties(model, oracle, [(3, USDT, MAX_UINT), (2, USDT, 10**8), (2, USDT, 10**9), (1, USDT, 1)])
+    ranked = rank(results)
+    assert [(result['position'], result['paid']) for result in ranked] == [(2, 10**9), (2, 10**8)]
+    # 1.05 * 1.02 bounty on the repaid value
+    assert ranked[0]['value'] == pytest.approx(ranked[0]['cost'] * 1.05 * 1.02, rel=1e-6)
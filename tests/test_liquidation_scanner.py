@@ -0,0 +1,89 @@
+import pytest
+from scripts.bank_model import HomoraBankModel
+from scripts.health_engine import OracleSnapshot, evaluate
+from scripts.liquidation_scanner import LiquidationScanner
+
+USDT = '0x0000000000000000000000000000000000000001'
+USDC = '0x0000000000000000000000000000000000000002'
+LP_A = '0x0000000000000000000000000000000000000003'
+LP_B = '0x0000000000000000000000000000000000000004'
+WERC20 = '0x0000000000000000000000000000000000000005'
+ALICE = '0x00000000000000000000000000000000000000aa'
+
+
+def setup_scanner():
+    model = HomoraBankModel(fee_bps=2000)
+    model.add_bank(USDT)
+    model.add_bank(USDC)
+    # (collateral LP, LP amount, USDT borrow, USDC borrow)
+    for lp, size, usdt, usdc in [
+        (LP_A, 10**18, 1000 * 10**6, 0),
+        (LP_A, 10**18, 0, 1500 * 10**6),
+        (LP_B, 10**18, 1500 * 10**6, 0),
+        (LP_B, 10**18, 0, 0),
+    ]:
+        pos_id = model.open_position(ALICE)
+        model.put_collateral(pos_id, WERC20, int(lp, 16), size)
+        if usdt:
+            model.borrow(pos_id, USDT, usdt)
+        if usdc:
+            model.borrow(pos_id, USDC, usdc)
+    oracle = OracleSnapshot(
+        {
+            USDT: 2**112 * 10**12 // 600,
+            USDC: 2**112 * 10**12 // 600,
+            LP_A: 2**112 * 10 // 3,  # 2000 USD
+            LP_B: 2**112 * 10 // 3,
+        },
+        {token: (10000, 9000, 10500) for token in (USDT, USDC, LP_A, LP_B)},
+        [WERC20],
+        {(WERC20, int(lp, 16)): (lp, 2**112) for lp in (LP_A, LP_B)},
+    )
+    return model, oracle, LiquidationScanner(model, oracle)
+
+
+def assert_consistent(model, oracle, scanner):
+    health = evaluate(model, oracle)
+    assert scanner.liquidatable == set(health.liquidatable())
+    for pos_id, coll, borrow in zip(health.ids, health.collateral, health.borrow):
+        assert scanner.collateral[pos_id] == coll
+        assert scanner.borrow[pos_id] == borrow
+
+
+def test_indexes():
+    model, oracle, scanner = setup_scanner()
+    assert scanner.by_debt[0] == {1, 3}
+    assert scanner.by_debt[1] == {2}
+    assert scanner.by_collateral[LP_A] == {1, 2}
+    assert scanner.by_collateral[LP_B] == {3, 4}
+    assert scanner.exposed(USDT) == {1, 3}
+    assert scanner.exposed(LP_B) == {3, 4}
+    assert scanner.liquidatable == set()
+
+
+def test_price_update():
+    model, oracle, scanner = setup_scanner()
+    assert scanner.on_prices({LP_A: 2**112 * 3 // 2}) == {1, 2}  # LP_A drops to 900 USD
+    assert scanner.liquidatable == {1, 2}
+    assert_consistent(model, oracle, scanner)
+    assert scanner.on_prices({LP_A: 2**112 * 10 // 3}) == set()
+    assert scanner.liquidatable == set()
+
+
+def test_token_factors_and_accrue():
+    model, oracle, scanner = setup_scanner()
+    assert scanner.on_token_factors({USDT: (11000, 10000, 10500)}) == set()
+    assert scanner.on_accrue(USDT, 2800 * 10**6) == {3}
+    assert_consistent(model, oracle, scanner)
+
+
+def test_position_change():
+    model, oracle, scanner = setup_scanner()
+    model.repay(3, USDT)
+    model.borrow(3, USDC, 100 * 10**6)
+    scanner.on_positions([3], exact=True)
+    assert scanner.by_debt[0] == {1}
+    assert scanner.by_debt[1] == {2, 3}
+    assert scanner.exposed(USDT) == {1}
+    assert scanner.on_prices({USDT: 2**112 * 10**12 // 100}) == {1}
+    assert_consistent(model, oracle, scanner)
@@ -0,0 +1,45 @@
+import pytest
+from scripts.proof_store import ProofStore, write
+from scripts.safebox_merkle import build, leaf, rebuild, update
+from helper_merkle import records
+
+
+def levels_of(n):
+    return [bytearray(nodes) for nodes in build(records(n), processes=1)[2]]
+
+
+@pytest.mark.parametrize('n, changed', [(1, [0]), (7, [0, 6]), (8, [3]), (33, [0, 16, 32])])
+def test_changed_leaves(n, changed):
+    new = records(n)
+    for index in changed:
+        new[index] = (new[index][0], new[index][1] + 1)
+    levels = update(levels_of(n), {index: leaf(*new[index]) for index in changed})
+    assert levels == build(new, processes=1)[2]
+
+
+@pytest.mark.parametrize('n, added', [(0, 1), (1, 1), (7, 1), (8, 1), (8, 9), (33, 100)])
+def test_appended_leaves(n, added):
+    new = records(n + added)
+    levels = levels_of(n) if n else [bytearray()]
+    levels = update(levels, {index: leaf(*new[index]) for index in range(n, n + added)})
+    assert levels == build(new, processes=1)[2]
+
+
+def test_gap():
+    with pytest.raises(Exception, match='leaves a gap'):
+        update(levels_of(4), {5: b'\x00' * 32})
+
+
+def test_rebuild_store(tmp_path):
+    old = records(20)
+    write(tmp_path / 'proofs.bin', *build(old, processes=1))
+    new = old + records(25)[20:]
+    new[3] = (new[3][0], 123)
+    changes = [(new[3][0].upper().replace('0X', '0x'), 123)] + new[20:]
+    users, amounts, levels = rebuild(tmp_path / 'proofs.bin', changes)
+    assert (users, amounts) == ([user for user, _ in new], [amount for _, amount in new])
+    assert levels == build(new, processes=1)[2]
+    write(tmp_path / 'proofs.bin', users, amounts, levels)
+    with ProofStore(tmp_path / 'proofs.bin') as store:
+        assert store.root == levels[-1]
+        assert store.claim(new[3][0])[0] == 123
@@ -0,0 +1,44 @@
+import pytest
+from scripts.bank_model import MAX_UINT
+from scripts.optimal_deposit import get_amount_out, optimal_deposit, optimal_deposit_a, plan, plans
+
+RES_USDT = 600 * 10**12  # 600M USDT
+RES_WETH = 10**24  # 1M WETH
+
+
+def test_balanced_deposit_needs_no_swap():
+    assert optimal_deposit(600 * 10**6, 10**18, RES_USDT, RES_WETH) == (0, False)
+
+
+def test_direction():
+    swap, reversed_ = optimal_deposit(10**6, 10**18, RES_USDT, RES_WETH)
+    assert reversed_
+    assert 0 < swap < 10**18
+    swap, reversed_ = optimal_deposit(1000 * 10**6, 0, RES_USDT, RES_WETH)
+    assert not reversed_
+    assert swap == pytest.approx(500 * 10**6, rel=1e-2)
+
+
+def test_overflow_reverts():
+    # the spell reverts where the model used to return a value: amtB.add(resB), then b.mul(b).add(d)
+    with pytest.raises(Exception, match='SafeMath: addition overflow'):
+        optimal_deposit_a(1, MAX_UINT, 0, 1)
+    with pytest.raises(Exception, match='SafeMath: addition overflow'):
+        optimal_deposit_a(50 * 2**112, 0, 2**127 // 1997, 1)
+
+
+def test_single_sided_leaves_no_dust():
+    result = plan(10**18, 0, 100 * 10**18, 60000 * 10**6, 10**15, slippage_bps=100)
+    # the swap leaves token amounts in the pool ratio, so the router takes almost all of both
+    assert 10**18 - result['swap'] - result['amount_a'] <= 10**6
+    out = get_amount_out(result['swap'], 100 * 10**18, 60000 * 10**6)
+    assert out - result['amount_b'] <= 1
+    assert result['amt_a_min'] == result['amount_a'] * 9900 // 10000
+    assert result['lp'] > 0
+
+
+def test_plans():
+    candidates = [(10**18, 0), (0, 600 * 10**6), (2 * 10**18, 300 * 10**6)]
+    results = plans(*zip(*candidates), [RES_WETH] * 3, [RES_USDT] * 3, [10**20] * 3)
+    assert [result['reversed'] for result in results] == [False, True, False]
+    assert results == [plan(a, b, RES_WETH, RES_USDT, 10**20) for a, b in candidates]
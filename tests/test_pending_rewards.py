@@ -0,0 +1,44 @@
+from scripts.pending_rewards import WCHEF, WGAUGE, WSTAKING, decode, pending, pending_rewards, pools
+from helper_book import setup_positions
+
+WCHEF_ADDR = '0x0000000000000000000000000000000000000001'
+WGAUGE_ADDR = '0x0000000000000000000000000000000000000002'
+WSTAKING_ADDR = '0x0000000000000000000000000000000000000003'
+WERC20_ADDR = '0x0000000000000000000000000000000000000004'
+WRAPPERS = {WCHEF_ADDR: WCHEF, WGAUGE_ADDR: WGAUGE, WSTAKING_ADDR: WSTAKING}
+COLLATERALS = [
+    (WCHEF_ADDR, (12 << 240) | 5 * 10**11, 10**18),
+    (WCHEF_ADDR, (12 << 240) | 10**12, 2 * 10**18),
+    (WCHEF_ADDR, (3 << 240) | 7, 10**18),
+    (WGAUGE_ADDR, (9 << 246) | (1 << 240) | 10**17, 10**18),
+    (WSTAKING_ADDR, 3 * 10**17, 10**18),
+    (WERC20_ADDR, 1, 10**18),
+]
+
+
+def test_decode():
+    assert decode(WCHEF, (12 << 240) | 77) == (12, 77)
+    assert decode(WGAUGE, (9 << 246) | (63 << 240) | 77) == ((9, 63), 77)
+    assert decode(WSTAKING, 77) == (None, 77)
+
+
+def test_pending_rounds_like_burn():
+    assert pending(3, 5, 10**12 + 1, 10**12) == 5 - 4  # start rounds up, end rounds down
+    assert pending(5, 3, 10**12, 10**12) == 0
+
+
+def test_pending_rewards():
+    model = setup_positions(COLLATERALS)
+    assert sorted(pools(model, WRAPPERS)) == sorted([
+        (WCHEF_ADDR, 12), (WCHEF_ADDR, 3), (WGAUGE_ADDR, (9, 1)), (WSTAKING_ADDR, None)])
+    accumulators = {
+        (WCHEF_ADDR, 12): 2 * 10**12,
+        (WGAUGE_ADDR, (9, 1)): 4 * 10**17,
+        (WSTAKING_ADDR, None): 3 * 10**17,
+    }
+    assert pending_rewards(model, WRAPPERS, accumulators) == {
+        1: 15 * 10**17,
+        2: 2 * 10**18,
+        4: 3 * 10**17,
+        5: 0,
+    }
@@ -0,0 +1,24 @@
+import pytest
+from scripts.proof_store import ProofStore, write
+from scripts.safebox_merkle import build, proof, root
+from helper_merkle import records
+
+
+@pytest.mark.parametrize('n', [1, 2, 7, 64, 100])
+def test_lookup(tmp_path, n):
+    users, amounts, levels = build(records(n), processes=1)
+    write(tmp_path / 'proofs.bin', users, amounts, levels)
+    with ProofStore(tmp_path / 'proofs.bin') as store:
+        assert len(store) == n
+        assert store.root == root(levels)
+        for index, (user, amount) in enumerate(zip(users, amounts)):
+            assert store.claim(user) == (amount, proof(levels, index))
+            assert store.claim(user.upper().replace('0X', '0x')) == (amount, proof(levels, index))
+        assert store.claim('0x' + 'ff' * 20) is None
+        assert store.claim('0x' + '00' * 20) is None
+
+
+def test_bad_file(tmp_path):
+    (tmp_path / 'proofs.bin').write_bytes(b'\x00' * 64)
+    with pytest.raises(Exception, match='not a proof store'):
+        ProofStore(tmp_path / 'proofs.bin')
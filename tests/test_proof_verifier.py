@@ -0,0 +1,51 @@
+import pytest
+from scripts.proof_store import write
+from scripts.proof_verifier import check, shards, verify, verify_store
+from scripts.safebox_merkle import build, leaf, proof, root
+from helper_merkle import records
+
+
+def test_verify():
+    users, amounts, levels = build(records(5), processes=1)
+    assert verify(proof(levels, 2), root(levels), leaf(users[2], amounts[2]))
+    assert not verify(proof(levels, 2), root(levels), leaf(users[2], amounts[2] + 1))
+    assert not verify(proof(levels, 1), root(levels), leaf(users[2], amounts[2]))
+
+
+def test_shards():
+    assert shards(10, 3) == [(0, 4), (4, 8), (8, 10)]
+    assert shards(2, 8) == [(0, 1), (1, 2)]
+    assert shards(0, 8) == []
+
+
+@pytest.mark.parametrize('processes', [1, 2])
+def test_store(tmp_path, processes):
+    users, amounts, levels = build(records(50), processes=1)
+    write(tmp_path / 'proofs.bin', users, amounts, levels)
+    logs = []
+    assert verify_store(tmp_path / 'proofs.bin', root(levels), processes=processes, log=logs.append) == 50
+    assert logs[-1].endswith('50/50 proofs') or logs[-1] == '50 proofs ok'
+    with pytest.raises(Exception, match='bad proof'):
+        verify_store(tmp_path / 'proofs.bin', b'\x01' * 32, processes=processes, log=logs.append)
+    with pytest.raises(Exception, match='an expected root is required'):
+        verify_store(tmp_path / 'proofs.bin', None, processes=processes)
+
+
+def test_stale_leaf(tmp_path):
+    users, amounts, levels = build(records(20), processes=1)
+    amounts[7] += 1  # the index no longer matches the tree
+    write(tmp_path / 'proofs.bin', users, amounts, levels)
+    with pytest.raises(Exception, match=f"'leaf index': 7"):
+        verify_store(tmp_path / 'proofs.bin', root(levels), processes=2, log=lambda line: None)
+
+
+def test_stop_flag():
+    class Stop:
+        def is_set(self):
+            return True
+
+    class Store:
+        def record(self, position):
+            raise AssertionError('checked after stop')
+
+    assert check(Store(), b'\x00' * 32, 0, 3, stop=Stop()) is None
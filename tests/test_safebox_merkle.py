@@ -0,0 +1,46 @@
+import pytest
+from scripts import safebox_merkle
+from scripts.safebox_merkle import build, hash_pair, leaf, proof, read_records, root, write_proofs
+from helper_merkle import records
+
+
+def verify(siblings, expected_root, node):
+    for sibling in siblings:
+        node = hash_pair(node, sibling)
+    return node == expected_root
+
+
+def test_leaf_encoding():
+    user = '0x00000000000000000000000000000000000000aa'
+    assert leaf(user, 1) == safebox_merkle.keccak(bytes.fromhex('aa'.rjust(40, '0')) + (1).to_bytes(32, 'big'))
+
+
+def test_small_trees():
+    for n in [1, 2, 3, 5, 8, 13]:
+        users, amounts, levels = build(records(n), processes=1)
+        for index, (user, amount) in enumerate(zip(users, amounts)):
+            assert verify(proof(levels, index), root(levels), leaf(user, amount))
+        assert not verify(proof(levels, 0), root(levels), leaf(users[0], amounts[0] + 1))
+    # a single leaf is its own root
+    assert root(build(records(1), processes=1)[2]) == leaf(*records(1)[0])
+
+
+def test_pool_matches_inline(monkeypatch):
+    monkeypatch.setattr(safebox_merkle, 'CHUNK_SIZE', 4)
+    inline = build(records(37), processes=1)
+    pooled = build(records(37), processes=2)
+    assert pooled == inline
+
+
+def test_records_file(tmp_path):
+    path = tmp_path / 'records.csv'
+    path.write_text(''.join(f'{user.upper().replace("0X", "0x")},{amount}\n' for user, amount in records(3)))
+    assert list(read_records(path)) == records(3)
+    users, amounts, levels = build(read_records(path), processes=1)
+    write_proofs(tmp_path / 'proofs.jsonl', users, amounts, levels)
+    assert len((tmp_path / 'proofs.jsonl').read_text().splitlines()) == 3
+
+
+def test_duplicate_user():
+    with pytest.raises(Exception, match='duplicate user'):
+        build(records(3) + records(2)[1:], processes=1)
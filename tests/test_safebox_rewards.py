@@ -0,0 +1,60 @@
+import pytest
+from scripts.safebox_merkle import read_records
+from scripts.safebox_rewards import ZERO_ADDRESS, RewardAccrual, write_records
+
+ALICE = '0x00000000000000000000000000000000000000aa'
+BOB = '0x00000000000000000000000000000000000000bb'
+DAY = 86400
+
+
+def test_pro_rata():
+    accrual = RewardAccrual([(0, 10**18)], 0)  # 1 token per second
+    accrual.process([
+        (0, ZERO_ADDRESS, ALICE, 100),
+        (DAY, ZERO_ADDRESS, BOB, 300),
+        (2 * DAY, BOB, ALICE, 100),
+        (3 * DAY, ALICE, ZERO_ADDRESS, 200),
+    ])
+    balances = accrual.close_epoch(4 * DAY)
+    assert balances == {ALICE: (100 + 100 + 200 + 0) // 4, BOB: (0 + 300 + 200 + 200) // 4}
+    totals = accrual.totals()
+    # day 1 all to alice, day 2 split 1:3, day 3 split 2:2, day 4 all to bob
+    assert totals[ALICE] == pytest.approx(DAY * 10**18 * (1 + 0.25 + 0.5), rel=1e-15)
+    assert totals[BOB] == pytest.approx(DAY * 10**18 * (0.75 + 0.5 + 1), rel=1e-15)
+    assert sum(totals.values()) <= 4 * DAY * 10**18
+
+
+def test_schedule_and_empty_supply():
+    accrual = RewardAccrual([(0, 10**18), (2 * DAY, 2 * 10**18)], 0)
+    assert accrual.rewards_between(DAY, 3 * DAY) == DAY * 10**18 + DAY * 2 * 10**18
+    accrual.process([(DAY, ZERO_ADDRESS, ALICE, 5)])  # nothing accrues before the first mint
+    accrual.close_epoch(3 * DAY)
+    assert accrual.totals() == {ALICE: 3 * DAY * 10**18}
+
+
+def test_epochs_resume_from_saved_state(tmp_path):
+    events = [(0, ZERO_ADDRESS, ALICE, 100), (DAY, ZERO_ADDRESS, BOB, 100), (3 * DAY, ALICE, BOB, 50)]
+    one_pass = RewardAccrual([(0, 10**18)], 0)
+    one_pass.process(events)
+    one_pass.close_epoch(4 * DAY)
+
+    first = RewardAccrual([(0, 10**18)], 0)
+    first.process(events[:2])
+    first.close_epoch(2 * DAY)
+    first.save(tmp_path / 'state.json')
+    second = RewardAccrual.load(tmp_path / 'state.json')
+    second.process(events[2:])
+    assert second.close_epoch(4 * DAY) == {ALICE: (100 + 50) // 2, BOB: (100 + 150) // 2}
+    assert second.totals() == one_pass.totals()
+
+
+def test_overdraft():
+    accrual = RewardAccrual([(0, 1)], 0)
+    with pytest.raises(Exception, match='transfers 1 with a balance of 0'):
+        accrual.process([(0, ALICE, BOB, 1)])
+
+
+def test_write_records_keeps_order(tmp_path):
+    (tmp_path / 'old.csv').write_text(f'{BOB},5\n')
+    write_records(tmp_path / 'new.csv', {ALICE: 1, BOB: 7}, tmp_path / 'old.csv')
+    assert list(read_records(tmp_path / 'new.csv')) == [(BOB, 7), (ALICE, 1)]
@@ -0,0 +1,58 @@
+import pytest
+from scripts.stress_engine import correlated_shock, lp_shock, run, run_scenario, token_shock
+from helper_book import *
+
+ROWS = [(10**18, 1000 * 10**6, 0), (10**18, 1500 * 10**6, 0)]
+
+
+def test_no_shock():
+    model, oracle = setup_book(ROWS)
+    result = run_scenario(model, oracle, {'name': 'base'})
+    assert result == {'name': 'base', 'liquidatable': [], 'bad_debt': 0, 'bounty': 0}
+
+
+def test_lp_shock():
+    model, oracle = setup_book(ROWS)
+    # LP at 1400 USD: 1260 USD of collateral value, position 2 owes 1500 USD
+    result = run_scenario(model, oracle, lp_shock(LP, -3000))
+    assert result['liquidatable'] == [2]
+    assert result['bad_debt'] == pytest.approx(100 / 600 * 10**18, rel=1e-6)
+    # 1500 USD * 1.05 * 1.05 of LP is more than the whole 1400 USD of collateral
+    assert result['bounty'] == pytest.approx(1400 / 600 * 10**18, rel=1e-6)
+
+
+def test_bounty():
+    model, oracle = setup_book(ROWS)
+    # LP at 1660 USD: 1494 USD of collateral value, 1500 * 1.05 * 1.05 USD of LP paid out
+    result = run_scenario(model, oracle, lp_shock(LP, -1700))
+    assert result['liquidatable'] == [2]
+    assert result['bad_debt'] == 0
+    assert result['bounty'] == pytest.approx(1500 * 1.05 * 1.05 / 600 * 10**18, rel=1e-6)
+
+
+def test_bad_debt():
+    model, oracle = setup_book(ROWS)
+    # LP at 1000 USD: both positions are liquidatable, position 2 is 500 USD under water
+    # and both bounties are capped by the collateral
+    result = run_scenario(model, oracle, lp_shock(LP, -5000))
+    assert result['liquidatable'] == [1, 2]
+    assert result['bad_debt'] == pytest.approx(500 / 600 * 10**18, rel=1e-6)
+    assert result['bounty'] == pytest.approx(2000 / 600 * 10**18, rel=1e-6)
+
+
+def test_factor_override():
+    model, oracle = setup_book(ROWS)
+    scenario = token_shock(USDT, 0)
+    scenario['token_factors'] = {USDT: (13000, 10000, 10500)}
+    assert run_scenario(model, oracle, scenario)['liquidatable'] == [2]
+
+
+def test_correlated_shock():
+    scenario = correlated_shock({USDT: 1, USDC: 0.5}, -1000)
+    assert scenario['shocks'] == {USDT: -1000, USDC: -500}
+
+
+def test_process_pool_matches_inline():
+    model, oracle = setup_book(ROWS)
+    scenarios = [lp_shock(LP, -bps) for bps in range(0, 6000, 500)]
+    assert run(model, oracle, scenarios, processes=2) == run(model, oracle, scenarios, processes=1)
@@ -0,0 +1,46 @@
+import math
+
+import pytest
+from scripts.uniswap_oracle_model import get_eth_px, lp_prices, sqrt
+
+USDT = '0xdAC17F958D2ee523a2206206994597C13D831ec7'
+USDC = '0xA0b86991c6218b36c1d19D4a2e9Eb0cE3606eB48'
+WETH = '0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2'
+UNI_USDT_WETH = '0x0d4a11d5EEaaC28EC3F61d100daF4d40471f1852'
+UNI_USDC_USDT = '0x3041CbD36888bECc7bbCBc0045E3B1f144466f5f'
+PRICES = {USDT: 2**112 * 10**12 // 600, USDC: 2**112 * 10**12 // 600, WETH: 2**112}
+
+
+def test_sqrt():
+    for x in [1, 2, 3, 4, 8, 15, 16, 17, 2**112, 2**112 * 10**12 // 600, 10**40 + 7, 2**256 - 1]:
+        r = sqrt(x)
+        assert r == math.isqrt(x) or r == math.isqrt(x) + 1  # Newton may stop one above on large inputs
+        assert sqrt(x) == min(r, x // r)
+    assert sqrt(0) == 0
+
+
+def test_fair_price_ignores_manipulation():
+    supply = 10**15
+    balanced = get_eth_px(600 * 10**9, 10**21, supply, PRICES[USDT], PRICES[WETH])
+    assert balanced == pytest.approx(2 * 10**21 * 2**112 / supply, rel=1e-9)
+    # same k, reserves pushed to 2400 USDT per ETH
+    skewed = get_eth_px(1200 * 10**9, 10**21 // 2, supply, PRICES[USDT], PRICES[WETH])
+    assert skewed == pytest.approx(balanced, rel=1e-12)
+
+
+def test_lp_prices():
+    snapshot = {
+        UNI_USDT_WETH: (USDT, WETH, 600 * 10**9, 10**21, 10**15),
+        UNI_USDC_USDT: (USDC, USDT, 10**12, 10**12, 10**12),
+        '0x0000000000000000000000000000000000000001': (USDT, '0x0000000000000000000000000000000000000002', 1, 1, 1),
+        '0x0000000000000000000000000000000000000003': (USDT, WETH, 2**200, 2**200, 1),
+    }
+    results, errors = lp_prices(snapshot, PRICES)
+    assert results == {
+        pair: get_eth_px(*snapshot[pair][2:], PRICES[snapshot[pair][0]], PRICES[snapshot[pair][1]])
+        for pair in (UNI_USDT_WETH, UNI_USDC_USDT)
+    }
+    assert errors == {
+        '0x0000000000000000000000000000000000000001': 'no price for 0x0000000000000000000000000000000000000002',
+        '0x0000000000000000000000000000000000000003': 'SafeMath: multiplication overflow',
+    }
@@ -0,0 +1,41 @@
+import pytest
+from scripts.wrapper_ids import (decode_wchef, decode_wchef_many, decode_wgauge, decode_wgauge_many, encode_wchef,
+                                 encode_wchef_many, encode_wgauge, encode_wgauge_many, wchef_pids, wgauge_pools)
+
+
+def test_wchef():
+    id = encode_wchef(12, 2**240 - 1)
+    assert id == (12 << 240) | (2**240 - 1)
+    assert decode_wchef(id) == (12, 2**240 - 1)
+    with pytest.raises(Exception, match='bad pid'):
+        encode_wchef(2**16, 0)
+    with pytest.raises(Exception, match='bad sushi per share'):
+        encode_wchef(0, 2**240)
+
+
+def test_wgauge():
+    id = encode_wgauge(1023, 63, 5)
+    assert id == 2**256 - 2**240 + 5
+    assert decode_wgauge(id) == (1023, 63, 5)
+    with pytest.raises(Exception, match='bad pid'):
+        encode_wgauge(2**10, 0, 0)
+    with pytest.raises(Exception, match='bad gid'):
+        encode_wgauge(0, 2**6, 0)
+    with pytest.raises(Exception, match='bad crv per share'):
+        encode_wgauge(0, 0, 2**240)
+
+
+def test_many():
+    pids = [0, 1, 9, 2**16 - 1]
+    per_shares = [0, 1, 10**30, 2**240 - 1]
+    ids = encode_wchef_many(pids, per_shares)
+    assert decode_wchef_many(ids) == (pids, per_shares)
+    words = b''.join(id.to_bytes(32, 'big') for id in ids)
+    assert wchef_pids(words) == pids
+
+    gids = [0, 63, 5, 1]
+    gauge_pids = [0, 1, 9, 2**10 - 1]
+    ids = encode_wgauge_many(gauge_pids, gids, per_shares)
+    assert decode_wgauge_many(ids) == (gauge_pids, gids, per_shares)
+    words = b''.join(id.to_bytes(32, 'big') for id in ids)
+    assert wgauge_pools(words) == list(zip(gauge_pids, gids))